@@ -1,9 +1,11 @@
+import time
 from colorsys import rgb_to_hls, hls_to_rgb
 import six
 from PySide6.QtWidgets import QApplication, QWidget, QGridLayout, QSizePolicy, QStyleOption
 from PySide6.QtGui import QPainter
 from PySide6.QtCore import Signal, Qt, QSize, QTimer, QByteArray, QRectF, Property
 from PySide6.QtSvg import QSvgRenderer
+from frameclock import FrameClock
 
 
 class QLed(QWidget):
@@ -275,6 +277,8 @@ class QLed(QWidget):
         self.m_offColour = QLed.Grey
         self.m_shape = QLed.Circle
         self.m_clickable = False
+        self.m_useFrameClock = False
+        self.m_paintProfiler = None
 
         QWidget.__init__(self, parent, **kwargs)
 
@@ -286,7 +290,7 @@ class QLed(QWidget):
 
     def setValue(self, value):
         self.m_value = value
-        self.update()
+        self.scheduleUpdate()
 
     value = Property(bool, value, setValue)
 
@@ -295,7 +299,7 @@ class QLed(QWidget):
 
     def setOnColour(self, newColour):
         self.m_onColour = newColour
-        self.update()
+        self.scheduleUpdate()
 
     onColour = Property(int, onColour, setOnColour)
 
@@ -304,7 +308,7 @@ class QLed(QWidget):
 
     def setOffColour(self, newColour):
         self.m_offColour = newColour
-        self.update()
+        self.scheduleUpdate()
 
     offColour = Property(int, offColour, setOffColour)
 
@@ -313,7 +317,7 @@ class QLed(QWidget):
 
     def setShape(self, newShape):
         self.m_shape = newShape
-        self.update()
+        self.scheduleUpdate()
 
     shape = Property(int, shape, setShape)
 
@@ -325,6 +329,28 @@ class QLed(QWidget):
 
     clickable = Property(bool, clickable, setClickable)
 
+    def useFrameClock(self):
+        return self.m_useFrameClock
+
+    def setUseFrameClock(self, enable):
+        self.m_useFrameClock = enable
+
+    useFrameClock = Property(bool, useFrameClock, setUseFrameClock)
+
+    def paintProfiler(self):
+        return self.m_paintProfiler
+
+    def setPaintProfiler(self, profiler):
+        # a paintprofiler.PaintProfiler records the SVG load and render times, None turns profiling off
+        self.m_paintProfiler = profiler
+
+    def scheduleUpdate(self):
+        # with useFrameClock, repaints are batched onto the shared FrameClock
+        if self.m_useFrameClock:
+            FrameClock.instance().mark_dirty(self)
+        else:
+            self.update()
+
     def sizeHint(self):
         if self.m_shape == QLed.Triangle:
             return QSize(64, 48)
@@ -343,6 +369,10 @@ class QLed(QWidget):
         return (denormalise(nr), denormalise(ng), denormalise(nb))
 
     def paintEvent(self, event):
+        profiler = self.m_paintProfiler
+        if profiler is not None:
+            paint_started = time.perf_counter_ns()
+
         option = QStyleOption()
         option.initFrom(self)
 
@@ -373,8 +403,19 @@ class QLed(QWidget):
         light_str = "rgb(%d,%d,%d)" % self.adjust(dark_r, dark_g, dark_b)
 
         __xml = (self.shapes[self.m_shape] % (dark_str, light_str)).encode('utf8')
+        if profiler is None:
+            self.renderer.load(QByteArray(__xml))
+            self.renderer.render(painter, bounds)
+            return
+
+        started = time.perf_counter_ns()
         self.renderer.load(QByteArray(__xml))
+        loaded = time.perf_counter_ns()
         self.renderer.render(painter, bounds)
+        rendered = time.perf_counter_ns()
+        profiler.record(self, "svg_load", loaded - started)
+        profiler.record(self, "svg_render", rendered - loaded)
+        profiler.record_paint(self, rendered - paint_started)
 
     def mousePressEvent(self, event):
         self._pressed = True
@@ -394,7 +435,7 @@ class QLed(QWidget):
 
     def toggleValue(self):
         self.m_value = not self.m_value
-        self.update()
+        self.scheduleUpdate()
 
 
 if __name__ == "__main__":
@@ -24,6 +24,7 @@ SOFTWARE.
 from PySide6.QtCore import Qt, QPoint, Slot, Property, QPropertyAnimation, QEasingCurve
 from PySide6.QtWidgets import QWidget, QCheckBox, QApplication, QHBoxLayout
 from PySide6.QtGui import QPainter, QColor
+from frameclock import FrameClock
 
 
 def take_closest(num, collection):
@@ -102,6 +103,7 @@ class SwitchControl(QCheckBox):
         self.active_color = active_color
         self.auto = False
         self.pos_on_press = None
+        self.use_frame_clock = False
         if checked:
             self.__circle.move(self.width() - 26, 3)
             self.setChecked(True)
@@ -118,7 +120,7 @@ class SwitchControl(QCheckBox):
     @Slot(str)
     def set_bg_color(self, value):
         self.bg_color = value
-        self.update()
+        self.schedule_update()
 
     backgroundColor = Property(str, get_bg_color, set_bg_color)
 
@@ -129,7 +131,7 @@ class SwitchControl(QCheckBox):
     def set_circle_color(self, value):
         self.circle_color = value
         self.__circle.set_color(self.circle_color)
-        self.update()
+        self.schedule_update()
 
     circleBackgroundColor = Property(str, get_circle_color, set_circle_color)
 
@@ -149,10 +151,20 @@ class SwitchControl(QCheckBox):
     @Slot(str)
     def set_active_color(self, value):
         self.active_color = value
-        self.update()
+        self.schedule_update()
 
     activeColor = Property(str, get_active_color, set_active_color)
 
+    def set_use_frame_clock(self, enable=True):
+        self.use_frame_clock = enable
+
+    def schedule_update(self):
+        # with use_frame_clock, repaints are batched onto the shared FrameClock
+        if self.use_frame_clock:
+            FrameClock.instance().mark_dirty(self)
+        else:
+            self.update()
+
     def start_animation(self, checked):
         self.animation.stop()
         self.animation.setStartValue(self.__circle.pos())
@@ -164,6 +176,13 @@ class SwitchControl(QCheckBox):
             self.setChecked(False)
         self.animation.start()
 
+    def set_checked_immediately(self, checked):
+        # jump to the end position without animating, e.g. for offscreen rendering
+        self.animation.stop()
+        self.__circle.animation.stop()
+        self.__circle.move(self.width() - 26 if checked else 3, self.__circle.y())
+        self.setChecked(checked)
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -8,20 +8,432 @@
 # Converted to PySide6 by Eric Zimmerman
 #
 
+import bisect
+import contextlib
 import math
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 from PySide6.QtWidgets import QMainWindow, QWidget, QApplication
-from PySide6.QtGui import QPolygon, QPolygonF, QColor, QPen, QFont, QPainter, QFontMetrics, QConicalGradient
-from PySide6.QtCore import Qt, QTime, QTimer, QPoint, QPointF, QRect, QSize, QObject, Signal
+from PySide6.QtGui import QPolygon, QPolygonF, QColor, QPen, QFont, QPainter, QFontMetrics, QConicalGradient, QPixmap, \
+    QRegion, QTransform, QStaticText, QFontMetricsF, QBrush, QPainterPath, QImage
+from PySide6.QtCore import Qt, QTime, QTimer, QPoint, QPointF, QRect, QRectF, QSize, QObject, Signal, QByteArray, \
+    QDataStream
+from frameclock import FrameClock
+from dialcache import DialCache
+from dialjobs import DialJobs
+from trendbuffer import TrendBuffer
+from valuemarkers import ValueExtremes
+
+# one degree steps of the colored arc
+ARC_STEPS = np.arange(361, dtype=np.float64)
+
+POLYGON_PIE_CACHE_SIZE = 64
+polygon_pie_cache = OrderedDict()
+# dials are also drawn on pool threads, see set_enable_async_dial()
+polygon_pie_lock = threading.Lock()
+
+
+# settings of AnalogGauge.configure() that are plain attributes; True marks the ones rescale_method() depends on
+GAUGE_ATTRIBUTES = {
+    "value_min": False, "value_max": False, "value_offset": False, "value_needle_snapzone": False,
+    "scala_subdiv_count": False, "scale_angle_start_value": False, "scale_angle_size": False, "angle_offset": False,
+    "gauge_color_outer_radius_factor": False, "gauge_color_inner_radius_factor": False,
+    "scale_fontname": False, "value_fontname": False, "text_radius_factor": False,
+    "enable_fine_scaled_marker": False, "enable_big_scaled_marker": False, "enable_glyph_cache": False,
+    "enable_partial_repaint": False,
+    "initial_scale_fontsize": True, "initial_value_fontsize": True, "needle_scale_factor": True,
+}
+# settings of AnalogGauge.configure() applied through their setter
+GAUGE_SETTERS = {
+    "enable_Needle_Polygon": "set_enable_Needle_Polygon", "enable_scale_text": "set_enable_ScaleText",
+    "enable_barGraph": "set_enable_barGraph", "enable_value_text": "set_enable_value_text",
+    "enable_CenterPoint": "set_enable_CenterPoint", "enable_filled_Polygon": "set_enable_filled_Polygon",
+    "scala_main_count": "set_scala_main_count", "scale_polygon_colors": "set_scale_polygon_colors",
+}
+GAUGE_COLORS = ("NeedleColor", "NeedleColorDrag", "ScaleValueColor", "DisplayValueColor", "CenterPointColor",
+                "TrendColor", "MarkerColor", "PeakMarkerColor")
+
+# samples of the lookup tables nonlinear scale mappings are compiled into
+SCALE_TABLE_SIZE = 1025
+
+# milliseconds without a resize before the scaled cached layers are rebuilt at the new size
+RESIZE_SETTLE_MS = 150
+
+# seconds a chunk of feed_values() may start before the newest recorded sample; an earlier start is taken as a new
+# time base, and the trend and the value markers start over
+SAMPLE_TIME_JUMP = 1.0
+
+GLYPH_CACHE_SIZE = 32
+GLYPH_TEXT_CACHE_SIZE = 256
+glyph_caches = OrderedDict()
+
+
+def polygon_from_array(points):
+    """Build a QPolygonF from an (n, 2) array without creating a QPointF per point"""
+    data = QByteArray(np.array([len(points)], '>u4').tobytes() + np.ascontiguousarray(points, '>f8').tobytes())
+    stream = QDataStream(data)
+    polygon = QPolygonF()
+    stream >> polygon
+    return polygon
+
+
+def get_device_pixel_ratio(painter):
+    # ratio of the device actually painted on; painter.device() is still the widget when it is rendered into an image
+    engine = painter.paintEngine()
+    device = engine.paintDevice() if engine is not None else painter.device()
+    return device.devicePixelRatioF()
+
+
+class GlyphCache(object):
+    """Pre-rasterized glyphs of one font, color and device pixel ratio, composed into short strings
+
+    Strings seen a second time are composed into one pixmap and kept in a small LRU, so a readout that shows a
+    value again is a single blit while a sweep through new values does not pay for composing every string.
+    """
+
+    def __init__(self, font, color, dpr):
+        self.font = QFont(font)
+        self.color = QColor(color)
+        self.dpr = dpr
+        self.metrics = QFontMetricsF(self.font)
+        self.glyphs = {}
+        self.texts = OrderedDict()
+
+    def get_glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            advance = self.metrics.horizontalAdvance(char)
+            height = self.metrics.height()
+            # room for glyphs that paint outside their advance
+            pad = math.ceil(height / 4)
+            pixmap = QPixmap(math.ceil((advance + 2 * pad) * self.dpr), math.ceil(height * self.dpr))
+            pixmap.setDevicePixelRatio(self.dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setFont(self.font)
+            painter.setPen(self.color)
+            painter.drawText(QPointF(pad, self.metrics.ascent()), char)
+            painter.end()
+            glyph = (pixmap, advance, pad)
+            self.glyphs[char] = glyph
+        return glyph
+
+    def get_text(self, text):
+        # None when the text was not seen before
+        if text not in self.texts:
+            self.texts[text] = None
+            if len(self.texts) > GLYPH_TEXT_CACHE_SIZE:
+                self.texts.popitem(last=False)
+            return None
+        composed = self.texts[text]
+        self.texts.move_to_end(text)
+        if composed is not None:
+            return composed
+
+        glyphs, width, pad, offsets = self.layout_glyphs(text)
+        pixmap = QPixmap(math.ceil((width + 2 * pad) * self.dpr), math.ceil(self.metrics.height() * self.dpr))
+        pixmap.setDevicePixelRatio(self.dpr)
+        pixmap.fill(Qt.transparent)
+        if glyphs:
+            painter = QPainter(pixmap)
+            for (glyph_pixmap, advance, glyph_pad), offset in zip(glyphs, offsets):
+                painter.drawPixmap(QPointF(offset, 0), glyph_pixmap)
+            painter.end()
+
+        composed = (pixmap, width, pad)
+        self.texts[text] = composed
+        return composed
+
+    def layout_glyphs(self, text):
+        # glyph positions relative to the left edge of the composed pixmap, on whole device pixels, so drawing the
+        # glyphs one by one places them exactly like the composed pixmap does
+        glyphs = [self.get_glyph(char) for char in text]
+        width = sum(glyph[1] for glyph in glyphs)
+        pad = max([glyph[2] for glyph in glyphs] or [0])
+        offsets = []
+        x = pad
+        for glyph_pixmap, advance, glyph_pad in glyphs:
+            offsets.append(round((x - glyph_pad) * self.dpr) / self.dpr)
+            x += advance
+        return glyphs, width, pad, offsets
+
+    def draw_text(self, painter, rect, text):
+        # horizontally and vertically centered in rect, like drawText with Qt.AlignCenter
+        y = rect.y() + (rect.height() - self.metrics.height()) / 2
+        composed = self.get_text(text)
+        if composed is not None:
+            pixmap, width, pad = composed
+            painter.drawPixmap(QPointF(rect.x() + (rect.width() - width) / 2 - pad, y), pixmap)
+            return
+
+        glyphs, width, pad, offsets = self.layout_glyphs(text)
+        x = rect.x() + (rect.width() - width) / 2 - pad
+        for (pixmap, advance, glyph_pad), offset in zip(glyphs, offsets):
+            painter.drawPixmap(QPointF(x + offset, y), pixmap)
+
+
+def get_glyph_cache(font, color, dpr):
+    # shared between all gauges in the process
+    key = (font.key(), QColor(color).rgba(), dpr)
+    cache = glyph_caches.get(key)
+    if cache is None:
+        cache = GlyphCache(font, color, dpr)
+        glyph_caches[key] = cache
+        if len(glyph_caches) > GLYPH_CACHE_SIZE:
+            glyph_caches.popitem(last=False)
+    else:
+        glyph_caches.move_to_end(key)
+    return cache
+
+
+def to_color(value):
+    # QColor, a color name such as "#ff8000" or "red", or (R, G, B[, Transparency])
+    if isinstance(value, QColor):
+        color = QColor(value)
+    elif isinstance(value, str):
+        color = QColor(value)
+    elif isinstance(value, (list, tuple)) and len(value) in (3, 4):
+        color = QColor(*[int(channel) for channel in value])
+    else:
+        color = QColor(value)
+    if not color.isValid():
+        raise ValueError("not a color: %r" % (value,))
+    return color
+
+
+class ScaleTable(object):
+    """Monotonic samples of a scale mapping: values and the fractions of the arc they sit at"""
+
+    def __init__(self, values, fractions):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.fractions = np.asarray(fractions, dtype=np.float64)
+        # change of the fraction per value within each segment, for the local resolution of the scale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.slopes = np.nan_to_num(np.diff(self.fractions) / np.diff(self.values))
+        # single values, as for every needle angle, are interpolated without the overhead of a NumPy call
+        self.value_list = self.values.tolist()
+        self.fraction_list = self.fractions.tolist()
+        self.slope_list = self.slopes.tolist()
+
+    def to_fraction(self, values):
+        return np.interp(values, self.values, self.fractions)
+
+    def get_fraction(self, value):
+        index = bisect.bisect_right(self.value_list, value) - 1
+        if index < 0:
+            return self.fraction_list[0]
+        if index >= len(self.slope_list):
+            return self.fraction_list[-1]
+        return self.fraction_list[index] + (value - self.value_list[index]) * self.slope_list[index]
+
+    def to_value(self, fractions):
+        return np.interp(fractions, self.fractions, self.values)
+
+    def get_slope(self, value):
+        index = bisect.bisect_right(self.value_list, value) - 1
+        return self.slope_list[min(max(index, 0), len(self.slope_list) - 1)]
+
+
+class ScaleMapping(object):
+    """How values are spread over the scale arc
+
+    Subclasses implement to_fraction() and to_value(), the mapping between values and fractions (0 to 1) of the arc
+    and its inverse, on NumPy arrays. AnalogGauge.set_scale_mapping() compiles a mapping into a ScaleTable once per
+    range; needle, bar graph, ticks and labels are then interpolated from that table.
+    """
+
+    def get_key(self):
+        # equal keys give equal scales, so gauges with equal mappings share their cached dial
+        return (type(self).__name__,)
+
+    def __eq__(self, other):
+        return isinstance(other, ScaleMapping) and self.get_key() == other.get_key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.get_key())
 
-class AnalogGaugeWidget(QWidget):
-    """Custom analog gauge widget"""
+    def validate(self, value_min, value_max):
+        if value_max <= value_min:
+            raise ValueError("value_max must be greater than value_min, got %r and %r" % (value_min, value_max))
+
+    def to_fraction(self, values, value_min, value_max):
+        return (values - value_min) / (value_max - value_min)
+
+    def to_value(self, fractions, value_min, value_max):
+        return value_min + fractions * (value_max - value_min)
+
+    def compile(self, value_min, value_max):
+        self.validate(value_min, value_max)
+        fractions = np.linspace(0, 1, SCALE_TABLE_SIZE)
+        return ScaleTable(self.to_value(fractions, value_min, value_max), fractions)
 
-    valueChanged = Signal(int)
+    def get_major_ticks(self, value_min, value_max, count):
+        # evenly spaced on the arc
+        return self.to_value(np.linspace(0, 1, count + 1), value_min, value_max)
+
+    def format_label(self, value):
+        return "%.3g" % value
+
+
+class LogScale(ScaleMapping):
+    """Logarithmic scale, for example for vacuum gauges; value_min must be above 0"""
 
-    def __init__(self, parent=None):
-        super(AnalogGaugeWidget, self).__init__(parent)
+    def validate(self, value_min, value_max):
+        super(LogScale, self).validate(value_min, value_max)
+        if value_min <= 0:
+            raise ValueError("a logarithmic scale needs value_min > 0, got %r" % value_min)
+
+    def to_fraction(self, values, value_min, value_max):
+        return np.log(values / value_min) / np.log(value_max / value_min)
+
+    def to_value(self, fractions, value_min, value_max):
+        return value_min * (value_max / value_min) ** fractions
+
+    def format_label(self, value):
+        return "%g" % float("%.2g" % value)
+
+
+class SqrtScale(ScaleMapping):
+    """Square root scale, spreading out the low end, as used for differential pressure flow meters"""
+
+    def to_fraction(self, values, value_min, value_max):
+        return np.sqrt(np.clip((values - value_min) / (value_max - value_min), 0, 1))
+
+    def to_value(self, fractions, value_min, value_max):
+        return value_min + fractions ** 2 * (value_max - value_min)
+
+
+class PiecewiseScale(ScaleMapping):
+    """Piecewise linear scale through (value, fraction of the arc) breakpoints
+
+    The breakpoints are used as the table as they are, and as the major ticks when their count matches.
+    """
+
+    def __init__(self, points):
+        points = sorted((float(value), float(fraction)) for value, fraction in points)
+        if len(points) < 2:
+            raise ValueError("a piecewise scale needs at least 2 points")
+        self.values = np.array([value for value, fraction in points])
+        self.fractions = np.array([fraction for value, fraction in points])
+        if np.any(np.diff(self.values) <= 0) or np.any(np.diff(self.fractions) <= 0):
+            raise ValueError("piecewise scale points must increase in value and fraction")
+
+    def get_key(self):
+        return (type(self).__name__, tuple(self.values), tuple(self.fractions))
+
+    def validate(self, value_min, value_max):
+        super(PiecewiseScale, self).validate(value_min, value_max)
+        # outside the points the fraction is constant, the range would not span any of the arc
+        if self.values[0] >= value_max or self.values[-1] <= value_min:
+            raise ValueError("the points of a piecewise scale (%g to %g) must overlap the range %r to %r" %
+                             (self.values[0], self.values[-1], value_min, value_max))
+
+    def to_fraction(self, values, value_min, value_max):
+        return np.interp(values, self.values, self.fractions)
+
+    def to_value(self, fractions, value_min, value_max):
+        return np.interp(fractions, self.fractions, self.values)
+
+    def compile(self, value_min, value_max):
+        self.validate(value_min, value_max)
+        # the fractions of the points are of the arc from value_min to value_max
+        low, high = self.to_fraction(np.array([value_min, value_max]), value_min, value_max)
+        inside = (self.values > value_min) & (self.values < value_max)
+        values = np.concatenate(([value_min], self.values[inside], [value_max]))
+        fractions = (np.concatenate(([low], self.fractions[inside], [high])) - low) / (high - low)
+        return ScaleTable(values, fractions)
 
+    def get_major_ticks(self, value_min, value_max, count):
+        if len(self.values) == count + 1:
+            return self.values.copy()
+        return super(PiecewiseScale, self).get_major_ticks(value_min, value_max, count)
+
+
+SCALE_MAPPINGS = {"linear": ScaleMapping, "log": LogScale, "sqrt": SqrtScale, "piecewise": PiecewiseScale}
+
+
+def create_scale_mapping(spec):
+    # a ScaleMapping, None or "linear", "log", "sqrt", or {"type": "piecewise", "points": [[value, fraction], ...]}
+    if spec is None or isinstance(spec, ScaleMapping):
+        return spec
+    if isinstance(spec, str):
+        spec = {"type": spec}
+    spec = dict(spec)
+    kind = spec.pop("type", None)
+    if kind not in SCALE_MAPPINGS:
+        raise ValueError("unknown scale mapping %r, expected one of %s" % (kind, ", ".join(sorted(SCALE_MAPPINGS))))
+    if kind == "linear":
+        return None
+    return SCALE_MAPPINGS[kind](**spec)
+
+
+def load_toml(path):
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import toml
+        return toml.load(path)
+    with open(path, "rb") as toml_file:
+        return tomllib.load(toml_file)
+
+
+class GaugeLayer(object):
+    """One step of the AnalogGauge render pipeline
+
+    paint is called with the shared painter, translated to the gauge center. Consecutive static layers are
+    rendered once into a cached pixmap; call invalidate_dial_cache() when their content changes.
+    static and condition may be callables that are evaluated on every paint.
+    bounds is an optional callable returning the QRect or QRegion (gauge coordinates, origin in the top left corner) a
+    dynamic layer currently covers.
+    Value changes only repaint the old and new bounds, so dynamic layers without bounds force a full repaint.
+    """
+
+    def __init__(self, name, paint, enabled=True, static=False, condition=None, bounds=None):
+        self.name = name
+        self.paint = paint
+        self.enabled = enabled
+        self.static = static
+        self.condition = condition
+        self.bounds = bounds
+
+    def is_active(self):
+        return self.enabled and (self.condition is None or self.condition())
+
+    def is_static(self):
+        return self.static() if callable(self.static) else self.static
+
+
+class GaugeNeedle(object):
+    """A named needle drawn on the dial in addition to the main one
+
+    polygon points up from the center, in pixels; None follows the shape of the main needle.
+    """
+
+    def __init__(self, name, value, color, polygon=None, enabled=True):
+        self.name = name
+        self.value = value
+        self.color = color
+        self.polygon = polygon
+        self.enabled = enabled
+
+
+class AnalogGauge(object):
+    """State and drawing of an analog gauge, independent of the widget that shows it
+
+    Subclasses provide width(), height(), size(), devicePixelRatioF() and update(region=None) and call init_gauge().
+    """
+
+    def init_gauge(self):
         self.use_timer_event = False
+        # inside batch_update() repaints are collected and done once at the end
+        self.batch_depth = 0
+        self.batch_dirty = False
         self.black = QColor(0, 0, 0, 255)
 
         self.set_NeedleColor(50, 50, 50, 255)
@@ -31,6 +443,9 @@ class AnalogGaugeWidget(QWidget):
         self.set_ScaleValueColor(50, 50, 50, 255)
         self.set_DisplayValueColor(50, 50, 50, 255)
         self.set_CenterPointColor(50, 50, 50, 255)
+        self.set_TrendColor(0, 120, 215, 255)
+        self.set_MarkerColor(0, 120, 215, 255)
+        self.set_PeakMarkerColor(220, 0, 0, 255)
 
         self.value_needle_count = 1
         self.value_needle = QObject
@@ -77,6 +492,9 @@ class AnalogGaugeWidget(QWidget):
         self.scale_fontsize = self.initial_scale_fontsize
 
         self.enable_value_text = True
+        self.enable_glyph_cache = True
+        self.value_text_format = None
+        self.value_text_precision = 0
         self.value_fontname = "Decorative"
         self.initial_value_fontsize = 40
         self.value_fontsize = self.initial_value_fontsize
@@ -92,16 +510,84 @@ class AnalogGaugeWidget(QWidget):
         self.needle_scale_factor = 0.8
         self.enable_Needle_Polygon = True
 
-        self.setMouseTracking(False)
-
-        if self.use_timer_event:
-            timer = QTimer(self)
-            timer.timeout.connect(self.update)
-            timer.start(10)
-        else:
-            self.update()
-
-        self.setWindowTitle("Analog Gauge")
+        # offscreen pixmaps holding the runs of static layers, keyed by layer names
+        self.dial_cache = {}
+        # opt-in rendering of changed dials on a thread pool, with the shared key of the job per run of layers
+        self.async_dial = False
+        self.dial_jobs = {}
+        # shared key of the job that failed per run of layers, rendered synchronously instead
+        self.failed_dial_jobs = {}
+
+        # value changes repaint only the region covered by the dynamic layers
+        self.enable_partial_repaint = True
+        self.pending_full_repaint = False
+        self.pending_region = QRegion()
+        self.pending_value_region = None
+        self.value_font_metrics = None
+        self.value_text_rects = {}
+        self.value_glyph_cache = None
+
+        # laid out scale labels, rebuilt when range, count, font or diameter change
+        self.scale_labels = None
+
+        # None is the linear scale; other mappings are compiled into scale_table once per range
+        self.scale_mapping = None
+        self.scale_table = None
+        self.scale_ticks = None
+
+        # without enable_barGraph the colored arc is swept over this pixmap of the full arc
+        self.full_arc_pixmap = None
+        self.bar_graph_path = None
+
+        # while resizing, the cached dial and arc are drawn scaled and rebuilt once the size settles
+        self.live_resize = False
+
+        # named needles besides the main one, in drawing order
+        self.needles = OrderedDict()
+
+        self.layers = []
+        for layer in self.create_default_layers():
+            self.add_layer(layer)
+
+        # opt-in filtering of update_value, see set_update_filter()
+        self.enable_update_filter = False
+        self.value_deadband = 0
+        self.value_deadband_pixels = 0
+        self.coalesce_updates = False
+        self.pending_value_signal = None
+        self.applied_updates = 0
+        self.dropped_updates = 0
+
+        # optional needle dynamics, see set_needle_dynamics()
+        self.needle_dynamics = None
+        self.needle_time_constant = 0.1
+        self.needle_damping_ratio = 1.0
+        self.needle_settle_pixels = 0.25
+        self.needle_value = self.value
+        self.needle_velocity = 0.0
+
+        # filled by feed_values()
+        self.last_sample_time = None
+        self.chunk_extremes = None
+
+        # optional history of the value drawn in the dial, see set_enable_trend(); the band's x, y, width and
+        # height in units of the dial diameter, relative to the center
+        self.trend = None
+        self.trend_rect_factors = (-0.18, -0.3, 0.36, 0.14)
+        # optional min/max and peak hold ticks, see set_enable_value_markers(); the markers last drawn
+        self.value_markers = None
+        self.shown_markers = {}
+        # wakes the markers when a held peak is released or a window extreme expires
+        self.marker_timer = None
+        # samples of update_value() are timed with time.monotonic() plus this offset, which follows the timestamps
+        # given to feed_values(), so the trend and the markers see one time base
+        self.sample_time_offset = 0.0
+        self.newest_sample_time = None
+
+        # per layer paint timings, see set_paint_profiler()
+        self.paint_profiler = None
+
+        self.schedule_repaint()
         self.rescale_method()
 
     def rescale_method(self):
@@ -121,86 +607,545 @@ class AnalogGaugeWidget(QWidget):
         self.scale_fontsize = self.initial_scale_fontsize * self.widget_diameter / 400
         self.value_fontsize = self.initial_value_fontsize * self.widget_diameter / 400
 
+    def begin_live_resize(self):
+        self.live_resize = True
+
+    def end_live_resize(self):
+        if self.live_resize:
+            self.live_resize = False
+            self.schedule_repaint()
+
+    def set_use_timer_event(self, enable=True):
+        # repaint on the shared FrameClock instead of on every change
+        self.use_timer_event = enable
+        self.update()
+
+    def schedule_repaint(self, region=None):
+        # region None repaints the whole widget
+        if self.batch_depth:
+            self.batch_dirty = True
+            return
+        if not self.use_timer_event:
+            if region is None:
+                self.update()
+            else:
+                self.update(region)
+            return
+        if region is None:
+            self.pending_full_repaint = True
+        else:
+            self.pending_region = self.pending_region.united(region)
+        FrameClock.instance().request_frame(self.flush_repaint)
+
+    def flush_repaint(self):
+        if self.pending_full_repaint:
+            self.update()
+        elif not self.pending_region.isEmpty():
+            self.update(self.pending_region)
+        self.pending_full_repaint = False
+        self.pending_region = QRegion()
+
+    def get_dynamic_region(self):
+        # area covered by the active dynamic layers, None if a layer cannot tell
+        if not self.enable_partial_repaint:
+            return None
+        region = QRegion()
+        for layer in self.layers:
+            if not layer.is_active() or layer.is_static():
+                continue
+            if layer.bounds is None:
+                return None
+            region = region.united(layer.bounds())
+        return region
+
+    def get_changed_region(self, region_before):
+        region_after = self.get_dynamic_region()
+        if region_before is None or region_after is None:
+            return None
+        return region_before.united(region_after)
+
     def change_value_needle_style(self, design):
         self.value_needle = []
         for i in design:
             self.value_needle.append(i)
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def update_value(self, value, mouse_controlled=False):
+        if self.trend is not None or self.value_markers is not None:
+            self.record_sample(min(max(value, self.value_min), self.value_max))
+        self.apply_value(value)
+
+    def apply_value(self, value):
         if value <= self.value_min:
-            self.value = self.value_min
+            clamped_value = self.value_min
         elif value >= self.value_max:
-            self.value = self.value_max
+            clamped_value = self.value_max
         else:
-            self.value = value
-        self.valueChanged.emit(int(value))
-        if not self.use_timer_event:
+            clamped_value = value
+
+        if self.enable_update_filter:
+            if abs(clamped_value - self.value) <= self.get_value_deadband():
+                self.dropped_updates += 1
+                # the sample was still recorded, the trend scrolls anyway
+                if self.trend is not None:
+                    self.schedule_repaint(self.to_widget_rect(self.get_trend_rect())
+                                          if self.enable_partial_repaint else None)
+                return
+            if self.coalesce_updates:
+                # latest value wins, signal and repaint happen once on the next frame
+                if self.pending_value_signal is None:
+                    self.pending_value_region = self.get_dynamic_region()
+                else:
+                    self.dropped_updates += 1
+                self.value = clamped_value
+                self.pending_value_signal = int(value)
+                FrameClock.instance().request_frame(self.flush_pending_update)
+                return
+
+        region_before = self.get_dynamic_region()
+        self.value = clamped_value
+        self.applied_updates += 1
+        self.emit_value_changed(int(value))
+        self.schedule_repaint(self.get_changed_region(region_before))
+        if self.needle_dynamics is not None:
+            # the readout changes right away, the needle follows on the next frames
+            FrameClock.instance().request_frame(self.step_needle)
+
+    def emit_value_changed(self, value):
+        pass
+
+    def get_sample_time(self):
+        return time.monotonic() + self.sample_time_offset
+
+    def record_sample(self, value):
+        now = self.get_sample_time()
+        self.newest_sample_time = now if self.newest_sample_time is None else max(self.newest_sample_time, now)
+        if self.trend is not None:
+            self.trend.append(value, now)
+        if self.value_markers is not None:
+            self.value_markers.add(value, now)
+            self.refresh_markers()
+
+    def record_samples(self, values, timestamps=None):
+        # values in time order, timestamps None for samples that all arrived now
+        if timestamps is None:
+            timestamps = np.full(len(values), self.get_sample_time())
+        else:
+            newest = self.newest_sample_time
+            if newest is not None and timestamps[0] < newest - SAMPLE_TIME_JUMP:
+                # samples recorded on another clock would never leave the window
+                self.clear_samples()
+                newest = None
+            self.sample_time_offset = float(timestamps[-1]) - time.monotonic()
+            self.newest_sample_time = float(timestamps[-1]) if newest is None else max(newest, float(timestamps[-1]))
+        if self.trend is not None:
+            self.trend.extend(values, timestamps)
+        if self.value_markers is not None:
+            self.value_markers.extend(values, timestamps)
+            self.refresh_markers()
+
+    def clear_samples(self):
+        if self.trend is not None:
+            self.trend.clear()
+        if self.value_markers is not None:
+            self.value_markers.reset()
+
+    def feed_values(self, values, timestamps=None, mode="last", keep_extremes=False):
+        # reduce a chunk of samples to the one value a display frame needs and apply it with a single update.
+        # mode is "last", "mean", "min" or "max"; NaN samples are ignored. Returns the applied value or None.
+        if mode not in ("last", "mean", "min", "max"):
+            raise ValueError("unknown feed mode %r" % mode)
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+            if len(timestamps) != len(values):
+                raise ValueError("got %d timestamps for %d values" % (len(timestamps), len(values)))
+            if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+                order = np.argsort(timestamps, kind="stable")
+                values = values[order]
+                timestamps = timestamps[order]
+
+        finite = np.isfinite(values)
+        if not finite.all():
+            values = values[finite]
+            if timestamps is not None:
+                timestamps = timestamps[finite]
+        if not len(values):
+            return None
+
+        if mode == "last":
+            reduced = values[-1]
+        elif mode == "mean":
+            reduced = values.mean()
+        elif mode == "min":
+            reduced = values.min()
+        else:
+            reduced = values.max()
+
+        if keep_extremes:
+            self.chunk_extremes = (float(values.min()), float(values.max()))
+        if timestamps is not None:
+            self.last_sample_time = float(timestamps[-1])
+        if self.trend is not None or self.value_markers is not None:
+            # the whole chunk is recorded, not just the reduced value
+            self.record_samples(np.clip(values, self.value_min, self.value_max), timestamps)
+        self.apply_value(float(reduced))
+        return float(reduced)
+
+    def feed_stream(self, chunks, mode="last", keep_extremes=False):
+        # chunks is an iterable of (timestamps, values) pairs or (n, 2) arrays of timestamp, value rows;
+        # all of them are reduced together and applied with one update
+        all_timestamps = []
+        all_values = []
+        for chunk in chunks:
+            if isinstance(chunk, tuple) and len(chunk) == 2:
+                timestamps, values = chunk
+            else:
+                rows = np.asarray(chunk, dtype=np.float64).reshape(-1, 2)
+                timestamps, values = rows[:, 0], rows[:, 1]
+            all_timestamps.append(np.atleast_1d(np.asarray(timestamps, dtype=np.float64)))
+            all_values.append(np.atleast_1d(np.asarray(values, dtype=np.float64)))
+        if not all_values:
+            return None
+        return self.feed_values(np.concatenate(all_values), np.concatenate(all_timestamps), mode, keep_extremes)
+
+    def set_update_filter(self, enable=True, deadband=0, deadband_pixels=0, coalesce=True):
+        # deadband is in value units, deadband_pixels in pixels travelled by the needle tip; the larger one wins.
+        # coalesced updates are applied on the next tick of the shared FrameClock.
+        self.flush_pending_update()
+        self.enable_update_filter = enable
+        self.value_deadband = deadband
+        self.value_deadband_pixels = deadband_pixels
+        self.coalesce_updates = coalesce
+
+    def get_needle_tip_pixels_per_value(self):
+        if self.value_max == self.value_min:
+            return 0
+        tip_radius = self.widget_diameter / 2 * self.needle_scale_factor + 6
+        if self.scale_mapping is not None:
+            # nonlinear scales resolve values differently along the arc, use the resolution at the current value
+            return abs(tip_radius * math.radians(self.scale_angle_size * self.get_scale_table().get_slope(self.value)))
+        return abs(tip_radius * math.radians(self.scale_angle_size / (self.value_max - self.value_min)))
+
+    def get_value_deadband(self):
+        deadband = self.value_deadband
+        if self.value_deadband_pixels > 0:
+            pixels_per_value = self.get_needle_tip_pixels_per_value()
+            if pixels_per_value > 0:
+                deadband = max(deadband, self.value_deadband_pixels / pixels_per_value)
+        return deadband
+
+    def flush_pending_update(self):
+        if self.pending_value_signal is None:
+            return
+        value = self.pending_value_signal
+        self.pending_value_signal = None
+        FrameClock.instance().cancel_frame(self.flush_pending_update)
+        self.applied_updates += 1
+        self.emit_value_changed(value)
+        # already running on a frame, repaint right away
+        region = self.get_changed_region(self.pending_value_region)
+        self.pending_value_region = None
+        if region is None:
+            self.update()
+        else:
+            self.update(region)
+        if self.needle_dynamics is not None:
+            FrameClock.instance().request_frame(self.step_needle)
+
+    def reset_update_counters(self):
+        self.applied_updates = 0
+        self.dropped_updates = 0
+
+    def set_needle_dynamics(self, mode="critical", time_constant=0.1, damping_ratio=1.0, settle_pixels=0.25):
+        # mode is None (needle jumps to the value), "critical" (critically damped) or "spring" (damping_ratio < 1
+        # overshoots). The needle is stepped on the shared FrameClock until its tip is within settle_pixels.
+        if mode not in (None, "critical", "spring"):
+            raise ValueError("unknown needle dynamics %r" % mode)
+        if time_constant <= 0:
+            raise ValueError("time_constant must be positive, got %r" % time_constant)
+        # start animating from where the needle is drawn right now
+        self.needle_value = self.get_needle_value()
+        self.needle_dynamics = mode
+        self.needle_time_constant = time_constant
+        self.needle_damping_ratio = damping_ratio
+        self.needle_settle_pixels = settle_pixels
+        if mode is None:
+            FrameClock.instance().cancel_frame(self.step_needle)
+            self.needle_value = self.value
+            self.needle_velocity = 0.0
+            self.schedule_repaint()
+        else:
+            FrameClock.instance().request_frame(self.step_needle)
+
+    def get_needle_value(self):
+        return self.value if self.needle_dynamics is None else self.needle_value
+
+    def step_needle(self):
+        if self.needle_dynamics is None:
+            return
+        # long pauses between frames (e.g. a hidden window) must not make the integration blow up
+        dt = min(FrameClock.instance().delta, 0.1)
+        omega = 1.0 / self.needle_time_constant
+        position = self.needle_value
+        velocity = self.needle_velocity
+        target = self.value
+
+        if self.needle_dynamics == "critical":
+            # exact solution of x'' = -omega^2 (x - target) - 2 omega x' over dt
+            decay = math.exp(-omega * dt)
+            offset = position - target
+            drift = (velocity + omega * offset) * dt
+            position = target + (offset + drift) * decay
+            velocity = (velocity - omega * drift) * decay
+        else:
+            # semi-implicit Euler, sub-stepped so the spring stays stable at low frame rates
+            steps = max(1, int(math.ceil(dt * omega / 0.25)))
+            h = dt / steps
+            for _ in range(steps):
+                acceleration = -omega * omega * (position - target) - 2 * self.needle_damping_ratio * omega * velocity
+                velocity += acceleration * h
+                position += velocity * h
+
+        region_before = self.get_dynamic_region()
+        pixels_per_value = self.get_needle_tip_pixels_per_value()
+        settled = (abs(position - target) * pixels_per_value < self.needle_settle_pixels and
+                   abs(velocity) * dt * pixels_per_value < self.needle_settle_pixels)
+        if settled:
+            position = target
+            velocity = 0.0
+        else:
+            FrameClock.instance().request_frame(self.step_needle)
+
+        self.needle_value = position
+        self.needle_velocity = velocity
+        region = self.get_changed_region(region_before)
+        if region is None:
             self.update()
+        else:
+            self.update(region)
+
+    @contextlib.contextmanager
+    def batch_update(self):
+        """Collect the repaints of all changes made inside the block into one full repaint at its end
+
+        Cached layers are keyed by their configuration, so they are rebuilt at most once, on that repaint.
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth and self.batch_dirty:
+                self.batch_dirty = False
+                self.schedule_repaint()
+
+    def normalize_setting(self, name, value):
+        if name in GAUGE_COLORS:
+            return to_color(value)
+        if name == "scale_polygon_colors":
+            # what set_scale_polygon_colors() stores for None
+            if value is None:
+                return [[0.0, QColor(Qt.transparent)]]
+            return [[float(position), to_color(color)] for position, color in value]
+        if name == "scala_main_count":
+            # clamped like set_scala_main_count()
+            return max(value, 1)
+        if name == "value_text_format":
+            if isinstance(value, dict):
+                return value.get("text_format"), int(value.get("precision", 0))
+            return value, self.value_text_precision
+        if name == "scale_mapping":
+            return create_scale_mapping(value)
+        if name == "value" or name in GAUGE_SETTERS or name in GAUGE_ATTRIBUTES:
+            return bool(value) if name.startswith("enable_") else value
+        raise ValueError("unknown gauge setting %r" % name)
+
+    def is_setting_unchanged(self, name, value):
+        if name in GAUGE_COLORS:
+            return getattr(self, name) == value
+        if name == "scale_polygon_colors":
+            current = [(position, QColor(color).rgba()) for position, color in self.scale_polygon_colors]
+            return current == [(position, color.rgba()) for position, color in value]
+        if name == "value_text_format":
+            return (self.value_text_format, self.value_text_precision) == value
+        return getattr(self, name) == value
+
+    def configure(self, **settings):
+        """Apply many settings with one repaint and return the names of those that changed
+
+        Names are the attributes of the gauge (value_min, enable_barGraph, scala_main_count, NeedleColor, ...),
+        "value_text_format" (a pattern or {"text_format", "precision"}), "scale_mapping" (see create_scale_mapping())
+        and "value", which is applied last.
+        All values are checked before any is applied; settings equal to the current value are skipped.
+        """
+        normalized = [(name, self.normalize_setting(name, value)) for name, value in settings.items()]
+        value_min = settings.get("value_min", self.value_min)
+        value_max = settings.get("value_max", self.value_max)
+        # a linear scale needs a range like any mapping
+        mapping = dict(normalized).get("scale_mapping", self.scale_mapping)
+        (mapping if mapping is not None else ScaleMapping()).validate(value_min, value_max)
+        # the value is compared as update_value() clamps it to the new range
+        normalized = [(name, min(max(value, value_min), value_max) if name == "value" else value)
+                      for name, value in normalized]
+        changed = [(name, value) for name, value in normalized if not self.is_setting_unchanged(name, value)]
+
+        rescale = False
+        with self.batch_update():
+            for name, value in changed:
+                if name == "value":
+                    continue
+                if name in GAUGE_COLORS:
+                    getattr(self, "set_" + name)(value.red(), value.green(), value.blue(), value.alpha())
+                elif name in GAUGE_SETTERS:
+                    getattr(self, GAUGE_SETTERS[name])(value)
+                elif name == "value_text_format":
+                    self.set_value_text_format(*value)
+                elif name == "scale_mapping":
+                    # validated against the new range above
+                    self.scale_mapping = value
+                    self.schedule_repaint()
+                elif name in GAUGE_ATTRIBUTES:
+                    setattr(self, name, value)
+                    rescale = rescale or GAUGE_ATTRIBUTES[name]
+                    self.schedule_repaint()
+            if rescale:
+                self.rescale_method()
+            if "value" in dict(changed):
+                self.update_value(settings["value"])
+        return [name for name, value in changed]
+
+    def configure_from_dict(self, settings):
+        return self.configure(**settings)
+
+    def configure_from_toml(self, path, table=None):
+        # table selects a nested table such as "gauges.pressure"
+        settings = load_toml(path)
+        if table is not None:
+            for part in table.split("."):
+                settings = settings[part]
+        return self.configure(**settings)
+
+    def set_paint_profiler(self, profiler):
+        # a paintprofiler.PaintProfiler records the time of every paint and layer, None turns profiling off
+        self.paint_profiler = profiler
 
     def set_NeedleColor(self, R=50, G=50, B=50, Transparency=255):
         self.NeedleColor = QColor(R, G, B, Transparency)
         self.NeedleColorReleased = self.NeedleColor
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_NeedleColorDrag(self, R=50, G=50, B=50, Transparency=255):
         self.NeedleColorDrag = QColor(R, G, B, Transparency)
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_ScaleValueColor(self, R=50, G=50, B=50, Transparency=255):
         self.ScaleValueColor = QColor(R, G, B, Transparency)
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_DisplayValueColor(self, R=50, G=50, B=50, Transparency=255):
         self.DisplayValueColor = QColor(R, G, B, Transparency)
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
+
+    def set_TrendColor(self, R=0, G=120, B=215, Transparency=255):
+        self.TrendColor = QColor(R, G, B, Transparency)
+        self.schedule_repaint()
+
+    def set_MarkerColor(self, R=0, G=120, B=215, Transparency=255):
+        self.MarkerColor = QColor(R, G, B, Transparency)
+        self.schedule_repaint()
+
+    def set_PeakMarkerColor(self, R=220, G=0, B=0, Transparency=255):
+        self.PeakMarkerColor = QColor(R, G, B, Transparency)
+        self.schedule_repaint()
 
     def set_CenterPointColor(self, R=50, G=50, B=50, Transparency=255):
         self.CenterPointColor = QColor(R, G, B, Transparency)
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_enable_Needle_Polygon(self, enable=True):
         self.enable_Needle_Polygon = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_enable_ScaleText(self, enable=True):
         self.enable_scale_text = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_enable_barGraph(self, enable=True):
         self.enable_barGraph = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_enable_value_text(self, enable=True):
         self.enable_value_text = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
+
+    def set_enable_trend(self, enable=True, span=60.0, capacity=4096):
+        """Draw the values of the last span seconds as a band in the dial, keeping up to capacity samples
+
+        Samples are timed with time.monotonic(), or with the timestamps given to feed_values().
+        """
+        if enable:
+            if self.trend is None or self.trend.capacity != capacity:
+                self.trend = TrendBuffer(capacity, span)
+            else:
+                self.trend.set_span(span)
+        else:
+            self.trend = None
+        self.schedule_repaint()
+
+    def set_enable_value_markers(self, enable=True, session=True, window=None, peak_hold=None, peak_decay=None):
+        """Mark the extremes of the value with ticks at the scale: the session min/max, the min/max of the last
+        window seconds and a peak held for peak_hold seconds, then falling peak_decay value units per second
+        (or at once without a decay)"""
+        if enable:
+            # the markers appear with the first sample, which also sets their time base
+            self.value_markers = ValueExtremes(session, window, peak_hold, peak_decay)
+        else:
+            self.value_markers = None
+        self.shown_markers = {}
+        self.stop_marker_refresh()
+        self.refresh_markers()
+        self.schedule_repaint()
+
+    def get_marker_timer(self):
+        if self.marker_timer is None:
+            self.marker_timer = QTimer(self) if isinstance(self, QObject) else QTimer()
+            self.marker_timer.setSingleShot(True)
+            self.marker_timer.timeout.connect(self.refresh_markers)
+        return self.marker_timer
+
+    def stop_marker_refresh(self):
+        # also drops the timer, which would keep a gauge without a parent alive
+        FrameClock.instance().cancel_frame(self.refresh_markers)
+        if self.marker_timer is not None:
+            self.marker_timer.stop()
+            self.marker_timer.timeout.disconnect(self.refresh_markers)
+            self.marker_timer.deleteLater()
+            self.marker_timer = None
+
+    def reset_value_markers(self):
+        # start over with the next sample
+        if self.value_markers is None:
+            return
+        self.value_markers.reset()
+        self.refresh_markers()
+
+    def get_value_markers(self):
+        return dict(self.shown_markers)
 
     def set_enable_CenterPoint(self, enable=True):
         self.enable_CenterPoint = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_enable_filled_Polygon(self, enable=True):
         self.enable_filled_Polygon = enable
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_scala_main_count(self, count):
         if count < 1:
             count = 1
         self.scala_main_count = count
-        if not self.use_timer_event:
-            self.update()
+        self.schedule_repaint()
 
     def set_scale_polygon_colors(self, color_array):
         if 'list' in str(type(color_array)):
@@ -209,182 +1154,902 @@ class AnalogGaugeWidget(QWidget):
             self.scale_polygon_colors = [[.0, Qt.transparent]]
         else:
             self.scale_polygon_colors = [[.0, Qt.transparent]]
-        if not self.use_timer_event:
-            self.update()
-
-    def draw_filled_polygon(self, outline_pen_with=0):
+        self.schedule_repaint()
+
+    def create_default_layers(self):
+        return [
+            # without enable_barGraph the arc follows the value and is painted every frame
+            GaugeLayer("filled_polygon", self.draw_filled_polygon, static=lambda: self.enable_barGraph,
+                       condition=lambda: self.enable_filled_Polygon, bounds=self.get_bar_graph_rect),
+            # scale marker lines
+            GaugeLayer("fine_scaled_marker", self.create_fine_scaled_marker, static=True,
+                       condition=lambda: self.enable_fine_scaled_marker),
+            GaugeLayer("big_scaled_marker", self.draw_big_scaled_markter, static=True,
+                       condition=lambda: self.enable_big_scaled_marker),
+            # scale marker value text
+            GaugeLayer("scale_text", self.create_scale_marker_values_text, static=True,
+                       condition=lambda: self.enable_scale_text),
+            GaugeLayer("value_text", self.create_values_text, condition=lambda: self.enable_value_text,
+                       bounds=lambda: self.to_widget_rect(self.get_value_text_rect(self.get_value_text()))),
+            GaugeLayer("trend", self.draw_trend, condition=lambda: self.trend is not None,
+                       bounds=lambda: self.to_widget_rect(self.get_trend_rect())),
+            GaugeLayer("value_markers", self.draw_value_markers, condition=lambda: bool(self.shown_markers),
+                       bounds=lambda: self.get_markers_region(self.shown_markers)),
+            GaugeLayer("needles", self.draw_needles, condition=lambda: bool(self.needles),
+                       bounds=self.get_needles_region),
+            GaugeLayer("needle", self.draw_needle, condition=lambda: self.enable_Needle_Polygon,
+                       bounds=lambda: self.get_needle_rect(self.get_needle_value())),
+            GaugeLayer("center_point",
+                       lambda painter: self.draw_big_needle_center_point(painter, self.widget_diameter / 6),
+                       condition=lambda: self.enable_CenterPoint,
+                       bounds=lambda: self.to_widget_rect(QRectF(-self.widget_diameter / 12, -self.widget_diameter / 12,
+                                                                 self.widget_diameter / 6, self.widget_diameter / 6))),
+        ]
+
+    def add_layer(self, layer, index=None):
+        if self.get_layer(layer.name) is not None:
+            raise ValueError("layer %r already exists" % layer.name)
+        if index is None:
+            self.layers.append(layer)
+        else:
+            self.layers.insert(index, layer)
+        self.schedule_repaint()
+
+    def remove_layer(self, name):
+        layer = self.get_layer(name)
+        if layer is None:
+            raise KeyError(name)
+        self.layers.remove(layer)
+        self.schedule_repaint()
+        return layer
+
+    def get_layer(self, name):
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        return None
+
+    def move_layer(self, name, index):
+        self.add_layer(self.remove_layer(name), index)
+
+    def set_layer_enabled(self, name, enable=True):
+        layer = self.get_layer(name)
+        if layer is None:
+            raise KeyError(name)
+        layer.enabled = enable
+        self.schedule_repaint()
+
+    def draw_filled_polygon(self, painter_filled_polygon, outline_pen_with=0):
         if self.scale_polygon_colors:
-            painter_filled_polygon = QPainter(self)
-            painter_filled_polygon.setRenderHint(QPainter.Antialiasing)
-            painter_filled_polygon.translate(self.width() / 2, self.height() / 2)
-            painter_filled_polygon.setPen(Qt.NoPen)
-
-            self.pen.setWidth(outline_pen_with)
-            if outline_pen_with > 0:
-                painter_filled_polygon.setPen(self.pen)
-
-            colored_scale_polygon = self.create_polygon_pie(
-                ((self.widget_diameter / 2) - (self.pen.width() / 2)) * self.gauge_color_outer_radius_factor,
-                (((self.widget_diameter / 2) - (self.pen.width() / 2)) * self.gauge_color_inner_radius_factor),
-                self.scale_angle_start_value, self.scale_angle_size)
-
-            grad = QConicalGradient(QPointF(0, 0), -self.scale_angle_size - self.scale_angle_start_value +
-                                    self.angle_offset - 1)
-
-            for eachcolor in self.scale_polygon_colors:
-                grad.setColorAt(eachcolor[0], eachcolor[1])
-
-            painter_filled_polygon.setBrush(grad)
-            painter_filled_polygon.drawPolygon(colored_scale_polygon)
+            if not self.enable_barGraph and outline_pen_with == 0:
+                self.draw_bar_graph(painter_filled_polygon)
+                return
+            length = self.scale_angle_size if self.enable_barGraph else self.get_bar_graph_length()
+            self.draw_colored_arc(painter_filled_polygon, length, outline_pen_with)
+
+    def draw_colored_arc(self, painter_filled_polygon, length, outline_pen_with=0):
+        painter_filled_polygon.setPen(Qt.NoPen)
+
+        self.pen.setWidth(outline_pen_with)
+        if outline_pen_with > 0:
+            painter_filled_polygon.setPen(self.pen)
+
+        colored_scale_polygon = self.create_polygon_pie(
+            ((self.widget_diameter / 2) - (self.pen.width() / 2)) * self.gauge_color_outer_radius_factor,
+            (((self.widget_diameter / 2) - (self.pen.width() / 2)) * self.gauge_color_inner_radius_factor),
+            self.scale_angle_start_value, length)
+
+        grad = QConicalGradient(QPointF(0, 0), -self.scale_angle_size - self.scale_angle_start_value +
+                                self.angle_offset - 1)
+
+        for eachcolor in self.scale_polygon_colors:
+            grad.setColorAt(eachcolor[0], eachcolor[1])
+
+        painter_filled_polygon.setBrush(grad)
+        painter_filled_polygon.drawPolygon(colored_scale_polygon)
+
+    def get_bar_graph_length(self):
+        # degrees of the arc filled up to the current value
+        if self.scale_mapping is not None:
+            return max(int(round(self.scale_angle_size * self.get_value_fraction(self.value))), 0)
+        length = int(round((self.scale_angle_size / (self.value_max - self.value_min)) * (self.value - self.value_min)))
+        return max(length, 0)
+
+    def get_full_arc_pixmap(self, dpr):
+        key = (self.width(), self.height(), dpr, self.widget_diameter, self.gauge_color_outer_radius_factor,
+               self.gauge_color_inner_radius_factor, self.scale_angle_start_value, self.scale_angle_size,
+               self.angle_offset, tuple((position, QColor(color).rgba()) for position, color in self.scale_polygon_colors))
+        if self.full_arc_pixmap is not None and self.full_arc_pixmap[0] == key:
+            return self.full_arc_pixmap[1]
+
+        pixmap = DialCache.instance().get_or_create(("full_arc", type(self).draw_colored_arc) + key,
+                                                    lambda: self.create_full_arc_pixmap(dpr))
+        self.full_arc_pixmap = (key, pixmap)
+        return pixmap
+
+    def create_full_arc_pixmap(self, dpr):
+        pixmap = QPixmap(self.size() * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        if not pixmap.isNull():
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.translate(self.width() / 2, self.height() / 2)
+            self.draw_colored_arc(painter, self.scale_angle_size)
+            painter.end()
+        return pixmap
+
+    def get_bar_graph_path(self, length):
+        # pie from the center over the first length degrees of the arc, reaching past its outer edge
+        radius = self.widget_diameter / 2 * max(self.gauge_color_outer_radius_factor, 1) + 2
+        key = (length, radius, self.scale_angle_start_value, self.angle_offset)
+        if self.bar_graph_path is not None and self.bar_graph_path[0] == key:
+            return self.bar_graph_path[1]
+
+        path = QPainterPath(QPointF(0, 0))
+        path.arcTo(QRectF(-radius, -radius, 2 * radius, 2 * radius),
+                   self.angle_offset - self.scale_angle_start_value, -length)
+        path.closeSubpath()
+        self.bar_graph_path = (key, path)
+        return path
+
+    def get_bar_graph_rect(self):
+        length = self.get_bar_graph_length()
+        if length <= 0:
+            return QRect()
+        return self.to_widget_rect(self.get_bar_graph_path(length).boundingRect())
+
+    def draw_bar_graph(self, painter):
+        # constant cost: one pie filled with the pre-rendered full arc, however far the bar reaches
+        length = self.get_bar_graph_length()
+        if length <= 0:
+            return
+        painter.setPen(Qt.NoPen)
+        if self.live_resize and self.full_arc_pixmap is not None and self.full_arc_pixmap[0][3] > 0:
+            key, pixmap = self.full_arc_pixmap
+            width, height, dpr, diameter = key[:4]
+            scale = self.widget_diameter / diameter
+            painter.scale(scale, scale)
+            painter.setBrushOrigin(QPointF(-width / 2, -height / 2))
+            painter.setBrush(QBrush(pixmap))
+            painter.drawPath(QTransform.fromScale(1 / scale, 1 / scale).map(self.get_bar_graph_path(length)))
+            return
+        painter.setBrushOrigin(QPointF(-self.width() / 2, -self.height() / 2))
+        painter.setBrush(QBrush(self.get_full_arc_pixmap(get_device_pixel_ratio(painter))))
+        painter.drawPath(self.get_bar_graph_path(length))
 
     def create_polygon_pie(self, outer_radius, inner_radius, start, length):
-        polygon_pie = QPolygonF()
-        n = 360
-        w = 360 / n
-
-        if not self.enable_barGraph:
-            length = int(round((length / (self.value_max - self.value_min)) * (self.value - self.value_min)))
-
-        for i in range(length + 1):
-            t = w * i + start - self.angle_offset
-            x = outer_radius * math.cos(math.radians(t))
-            y = outer_radius * math.sin(math.radians(t))
-            polygon_pie.append(QPointF(x, y))
-
-        for i in range(length + 1):
-            t = w * (length - i) + start - self.angle_offset
-            x = inner_radius * math.cos(math.radians(t))
-            y = inner_radius * math.sin(math.radians(t))
-            polygon_pie.append(QPointF(x, y))
-
-        polygon_pie.append(QPointF(x, y))
+        length = max(int(length), 0)
+
+        # the returned polygon is shared between callers and must not be modified
+        key = (outer_radius, inner_radius, start, length, self.angle_offset)
+        with polygon_pie_lock:
+            polygon_pie = polygon_pie_cache.get(key)
+            if polygon_pie is not None:
+                polygon_pie_cache.move_to_end(key)
+                return polygon_pie
+
+        steps = ARC_STEPS[:length + 1] if length < len(ARC_STEPS) else np.arange(length + 1, dtype=np.float64)
+        angles = np.radians(steps + (start - self.angle_offset))
+        cos = np.cos(angles)
+        sin = np.sin(angles)
+
+        # outer edge from start to end, inner edge back to start, closing on the last point like before
+        outer = np.column_stack((outer_radius * cos, outer_radius * sin))
+        inner = np.column_stack((inner_radius * cos[::-1], inner_radius * sin[::-1]))
+        polygon_pie = polygon_from_array(np.concatenate((outer, inner, inner[-1:])))
+
+        with polygon_pie_lock:
+            polygon_pie_cache[key] = polygon_pie
+            if len(polygon_pie_cache) > POLYGON_PIE_CACHE_SIZE:
+                polygon_pie_cache.popitem(last=False)
         return polygon_pie
 
-    def draw_needle(self):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.translate(self.width() / 2, self.height() / 2)
+    def set_scale_mapping(self, mapping=None):
+        """Spread the values nonlinearly over the arc; mapping is a ScaleMapping or its description, None is linear"""
+        mapping = create_scale_mapping(mapping)
+        if mapping is not None:
+            mapping.validate(self.value_min, self.value_max)
+        self.scale_mapping = mapping
+        self.schedule_repaint()
+
+    def get_scale_table(self):
+        cached = self.scale_table
+        if (cached is None or cached[0] is not self.scale_mapping or cached[1] != self.value_min or
+                cached[2] != self.value_max):
+            cached = self.scale_table = (self.scale_mapping, self.value_min, self.value_max,
+                                         self.scale_mapping.compile(self.value_min, self.value_max))
+        return cached[3]
+
+    def get_value_fraction(self, value):
+        # position of value along the arc, 0 at value_min and 1 at value_max
+        if self.scale_mapping is None:
+            return (value - self.value_min) / (self.value_max - self.value_min)
+        return self.get_scale_table().get_fraction(value)
+
+    def get_value_at_angle(self, angle):
+        # inverse of get_needle_angle(), for example for pointing at the scale
+        fraction = (angle - 90 - self.scale_angle_start_value) / self.scale_angle_size
+        if self.scale_mapping is None:
+            value = self.value_min + fraction * (self.value_max - self.value_min)
+        else:
+            value = float(self.get_scale_table().to_value(fraction))
+        return value + self.value_offset
+
+    def get_needle_angle(self, value):
+        if self.scale_mapping is not None:
+            return (self.get_value_fraction(value - self.value_offset) * self.scale_angle_size + 90 +
+                    self.scale_angle_start_value)
+        return ((value - self.value_offset - self.value_min) * self.scale_angle_size /
+                (self.value_max - self.value_min)) + 90 + self.scale_angle_start_value
+
+    def get_scale_ticks(self):
+        """Angles of the major and minor ticks and the values of the major ticks, computed once per scale"""
+        key = (self.scale_mapping, self.value_min, self.value_max, self.scala_main_count, self.scala_subdiv_count,
+               self.scale_angle_start_value, self.scale_angle_size, self.angle_offset)
+        if self.scale_ticks is not None and self.scale_ticks[0] == key:
+            return self.scale_ticks[1]
+        # shared with the gauges that have the same scale, the arrays must not be modified
+        self.scale_ticks = (key, DialCache.instance().get_or_create(("scale_ticks",) + key, self.create_scale_ticks))
+        return self.scale_ticks[1]
+
+    def create_scale_ticks(self):
+        start = float(self.scale_angle_start_value - self.angle_offset)
+        minor_count = self.scala_main_count * self.scala_subdiv_count
+        if self.scale_mapping is None:
+            major_angles = start + np.arange(self.scala_main_count + 1) * (self.scale_angle_size / self.scala_main_count)
+            minor_angles = start + np.arange(minor_count + 1) * (self.scale_angle_size / minor_count)
+            scale_per_div = int((self.value_max - self.value_min) / self.scala_main_count)
+            major_values = self.value_min + scale_per_div * np.arange(self.scala_main_count + 1)
+        else:
+            table = self.get_scale_table()
+            major_values = self.scale_mapping.get_major_ticks(self.value_min, self.value_max, self.scala_main_count)
+            # minor ticks divide the values between two major ticks evenly
+            minor_values = np.linspace(major_values[:-1], major_values[1:], self.scala_subdiv_count, endpoint=False,
+                                       axis=1).ravel()
+            minor_values = np.append(minor_values, major_values[-1])
+            major_angles = start + table.to_fraction(major_values) * self.scale_angle_size
+            minor_angles = start + table.to_fraction(minor_values) * self.scale_angle_size
+        return major_angles, minor_angles, major_values
+
+    def format_scale_label(self, value):
+        if self.scale_mapping is None:
+            return str(int(value))
+        return self.scale_mapping.format_label(value)
+
+    def to_widget_rect(self, rect):
+        # gauge coordinates (origin in the center) to an aligned widget rect with room for antialiasing
+        return QRectF(rect).translated(self.width() / 2, self.height() / 2).toAlignedRect().adjusted(-2, -2, 2, 2)
+
+    def get_needle_rect(self, value, polygon=None):
+        if polygon is None:
+            polygon = self.value_needle[0]
+        transform = QTransform()
+        transform.rotate(self.get_needle_angle(value))
+        return self.to_widget_rect(transform.map(QPolygonF(polygon)).boundingRect())
+
+    def add_needle(self, name, value=None, color=None, polygon=None):
+        """Add a named needle, drawn under the main needle; color takes the forms configure() accepts"""
+        if name in self.needles:
+            raise ValueError("needle %r already exists" % name)
+        if value is None:
+            value = self.value_min
+        color = QColor(self.NeedleColor) if color is None else to_color(color)
+        if polygon is not None:
+            polygon = QPolygonF([QPointF(*point) if isinstance(point, (list, tuple)) else QPointF(point)
+                                 for point in polygon])
+        needle = self.needles[name] = GaugeNeedle(name, min(max(value, self.value_min), self.value_max), color, polygon)
+        self.schedule_repaint(self.get_needle_rect(needle.value, needle.polygon))
+        return needle
+
+    def remove_needle(self, name):
+        needle = self.get_needle(name)
+        del self.needles[name]
+        self.schedule_repaint(self.get_needle_rect(needle.value, needle.polygon))
+        return needle
+
+    def get_needle(self, name):
+        needle = self.needles.get(name)
+        if needle is None:
+            raise KeyError(name)
+        return needle
+
+    def set_needle_color(self, name, color):
+        needle = self.get_needle(name)
+        needle.color = to_color(color)
+        self.schedule_repaint(self.get_needle_rect(needle.value, needle.polygon))
+
+    def set_needle_value(self, name, value):
+        self.set_needle_values({name: value})
+
+    def set_needle_values(self, values):
+        """Move several named needles, {name: value}, with one repaint of the area they moved over"""
+        needles = [(self.get_needle(name), value) for name, value in values.items()]
+        region = QRegion()
+        for needle, value in needles:
+            value = min(max(value, self.value_min), self.value_max)
+            if value == needle.value:
+                continue
+            if needle.enabled:
+                region = region.united(self.get_needle_rect(needle.value, needle.polygon))
+                region = region.united(self.get_needle_rect(value, needle.polygon))
+            needle.value = value
+        if not region.isEmpty():
+            self.schedule_repaint(region if self.enable_partial_repaint else None)
+
+    def get_needle_values(self):
+        return {name: needle.value for name, needle in self.needles.items()}
+
+    def get_needles_region(self):
+        region = QRegion()
+        for needle in self.needles.values():
+            if needle.enabled:
+                region = region.united(self.get_needle_rect(needle.value, needle.polygon))
+        return region
+
+    def get_needles_key(self):
+        # everything the named needles look like, for callers caching their rendering
+        return tuple((needle.name, needle.value, needle.color.rgba(), needle.enabled,
+                      None if needle.polygon is None else tuple((point.x(), point.y()) for point in needle.polygon))
+                     for needle in self.needles.values())
+
+    def get_trend_rect(self):
+        x, y, width, height = self.trend_rect_factors
+        diameter = self.widget_diameter
+        return QRectF(x * diameter, y * diameter, width * diameter, height * diameter)
+
+    def draw_trend(self, painter):
+        # one min/max pair per device pixel column, drawn as a single zig-zag polyline
+        rect = self.get_trend_rect()
+        columns = max(int(rect.width() * get_device_pixel_ratio(painter)), 1)
+        self.trend.set_columns(columns)
+        mins, maxs = self.trend.get_columns()
+        filled = ~np.isnan(mins)
+        if not filled.any():
+            return
+        x = rect.left() + (np.flatnonzero(filled) + 0.5) * (rect.width() / columns)
+        values = np.stack((mins[filled], maxs[filled]), axis=1)
+        if self.scale_mapping is None:
+            fractions = (values - self.value_min) / (self.value_max - self.value_min)
+        else:
+            fractions = self.get_scale_table().to_fraction(values)
+        points = np.empty((len(x) * 2, 2))
+        points[:, 0] = np.repeat(x, 2)
+        points[:, 1] = rect.bottom() - np.clip(fractions, 0, 1).ravel() * rect.height()
+        painter.setPen(QPen(self.TrendColor, 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPolyline(polygon_from_array(points))
+
+    def refresh_markers(self):
+        # repaint the ticks that moved; decaying peaks and expiring window extremes move them later
+        if self.value_markers is None:
+            return
+        now = self.get_sample_time()
+        markers = self.value_markers.get_markers(now)
+        if markers != self.shown_markers:
+            region = self.get_markers_region(self.shown_markers).united(self.get_markers_region(markers))
+            self.shown_markers = markers
+            self.schedule_repaint(region if self.enable_partial_repaint else None)
+        # a falling peak moves every frame, anything else changes once at a known time
+        change = self.value_markers.get_next_change(now)
+        if change is None:
+            if self.marker_timer is not None:
+                self.marker_timer.stop()
+        elif change <= now:
+            FrameClock.instance().request_frame(self.refresh_markers)
+        else:
+            self.get_marker_timer().start(max(math.ceil((change - now) * 1000), 1))
+
+    def get_marker_ticks(self, markers):
+        # (angle, inner radius, outer radius, color, pen width) per marker; session ticks sit at the rim, window
+        # ticks inside them and the peak spans both
+        outer = self.widget_diameter / 2
+        length = self.widget_diameter / 20
+        ticks = []
+        for name, value in markers.items():
+            if name == "peak":
+                ticks.append((self.get_needle_angle(value), outer - 2 * length, outer, self.PeakMarkerColor, 3))
+            elif name.startswith("session"):
+                ticks.append((self.get_needle_angle(value), outer - length, outer, self.MarkerColor, 2))
+            else:
+                ticks.append((self.get_needle_angle(value), outer - 2 * length, outer - length, self.MarkerColor, 2))
+        return ticks
+
+    def get_markers_region(self, markers):
+        region = QRegion()
+        for angle, inner, outer, color, width in self.get_marker_ticks(markers):
+            transform = QTransform()
+            transform.rotate(angle)
+            rect = transform.mapRect(QRectF(-width / 2, -outer, width, outer - inner))
+            region = region.united(self.to_widget_rect(rect.adjusted(-width, -width, width, width)))
+        return region
+
+    def get_markers_key(self):
+        return tuple(sorted(self.shown_markers.items())), self.MarkerColor.rgba(), self.PeakMarkerColor.rgba()
+
+    def draw_value_markers(self, painter):
+        for angle, inner, outer, color, width in self.get_marker_ticks(self.shown_markers):
+            painter.save()
+            painter.rotate(angle)
+            painter.setPen(QPen(color, width))
+            painter.drawLine(QPointF(0, -inner), QPointF(0, -outer))
+            painter.restore()
+
+    def draw_needles(self, painter):
+        painter.setPen(Qt.NoPen)
+        for needle in self.needles.values():
+            if not needle.enabled:
+                continue
+            painter.save()
+            painter.rotate(self.get_needle_angle(needle.value))
+            painter.setBrush(needle.color)
+            if needle.polygon is None:
+                painter.drawConvexPolygon(self.value_needle[0])
+            else:
+                painter.drawPolygon(needle.polygon)
+            painter.restore()
+
+    def draw_needle(self, painter):
+        painter.rotate(self.get_needle_angle(self.get_needle_value()))
+        self.draw_needle_polygon(painter)
+
+    def draw_needle_polygon(self, painter):
+        # the needle pointing up, before it is rotated to the value
         painter.setPen(Qt.NoPen)
         painter.setBrush(self.NeedleColor)
-        painter.rotate(((self.value - self.value_offset - self.value_min) * self.scale_angle_size /
-                        (self.value_max - self.value_min)) + 90 + self.scale_angle_start_value)
-
         painter.drawConvexPolygon(self.value_needle[0])
 
-    def draw_big_needle_center_point(self, diameter=30):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.translate(self.width() / 2, self.height() / 2)
+    def draw_big_needle_center_point(self, painter, diameter=30):
         painter.setPen(Qt.NoPen)
         painter.setBrush(self.CenterPointColor)
         painter.drawEllipse(int(-diameter / 2), int(-diameter / 2), int(diameter), int(diameter))
 
-    def create_fine_scaled_marker(self):
-        my_painter = QPainter(self)
-        my_painter.setRenderHint(QPainter.Antialiasing)
-        my_painter.translate(self.width() / 2, self.height() / 2)
-
+    def create_fine_scaled_marker(self, my_painter):
         my_painter.setPen(Qt.black)
-        my_painter.rotate(self.scale_angle_start_value - self.angle_offset)
-        steps_size = (float(self.scale_angle_size) / float(self.scala_main_count * self.scala_subdiv_count))
         scale_line_outer_start = self.widget_diameter / 2
         scale_line_length = (self.widget_diameter / 2) - (self.widget_diameter / 40)
-        for i in range((self.scala_main_count * self.scala_subdiv_count) + 1):
-            my_painter.drawLine(scale_line_length, 0, scale_line_outer_start, 0)
-            my_painter.rotate(steps_size)
-
-    def draw_big_scaled_markter(self):
-        my_painter = QPainter(self)
-        my_painter.setRenderHint(QPainter.Antialiasing)
-        my_painter.translate(self.width() / 2, self.height() / 2)
+        self.draw_scale_lines(my_painter, self.get_scale_ticks()[1], scale_line_length, scale_line_outer_start)
 
+    def draw_big_scaled_markter(self, my_painter):
         self.pen = QPen(QColor(0, 0, 0, 255))
         self.pen.setWidth(2)
         my_painter.setPen(self.pen)
 
-        my_painter.rotate(self.scale_angle_start_value - self.angle_offset)
-        steps_size = (float(self.scale_angle_size) / float(self.scala_main_count))
         scale_line_outer_start = self.widget_diameter / 2
         scale_line_length = (self.widget_diameter / 2) - (self.widget_diameter / 20)
-        for i in range(self.scala_main_count + 1):
-            my_painter.drawLine(scale_line_length, 0, scale_line_outer_start, 0)
-            my_painter.rotate(steps_size)
+        self.draw_scale_lines(my_painter, self.get_scale_ticks()[0], scale_line_length, scale_line_outer_start)
+
+    def draw_scale_lines(self, painter, angles, inner_radius, outer_radius):
+        previous = 0.0
+        for angle in angles:
+            painter.rotate(angle - previous)
+            painter.drawLine(inner_radius, 0, outer_radius, 0)
+            previous = angle
+
+    def get_scale_labels(self):
+        key = (self.value_min, self.value_max, self.scala_main_count, self.scale_fontname, self.scale_fontsize,
+               self.widget_diameter, self.scale_angle_start_value, self.scale_angle_size, self.angle_offset,
+               self.scale_mapping)
+        if self.scale_labels is not None and self.scale_labels[0] == key:
+            return self.scale_labels[1]
 
-    def create_scale_marker_values_text(self):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.translate(self.width() / 2, self.height() / 2)
         font = QFont(self.scale_fontname, self.scale_fontsize)
         fm = QFontMetrics(font)
 
-        pen_shadow = QPen()
-        pen_shadow.setBrush(self.ScaleValueColor)
-        painter.setPen(pen_shadow)
-
         text_radius_factor = 0.8
         text_radius = self.widget_diameter / 2 * text_radius_factor
-        scale_per_div = int((self.value_max - self.value_min) / self.scala_main_count)
-        angle_distance = (float(self.scale_angle_size) / float(self.scala_main_count))
+        major_angles, minor_angles, major_values = self.get_scale_ticks()
 
-        for i in range(self.scala_main_count + 1):
-            text = str(int(self.value_min + scale_per_div * i))
+        labels = []
+        for angle, value in zip(major_angles, major_values):
+            text = self.format_scale_label(value)
             w = fm.horizontalAdvance(text) + 1  # Use horizontalAdvance instead of width
             h = fm.height()
-            painter.setFont(QFont(self.scale_fontname, self.scale_fontsize))
-            angle = angle_distance * i + float(self.scale_angle_start_value - self.angle_offset)
             x = text_radius * math.cos(math.radians(angle))
             y = text_radius * math.sin(math.radians(angle))
-            painter.drawText(int(x - w / 2), int(y - h / 2), int(w), int(h), Qt.AlignCenter, text)
 
-    def create_values_text(self):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.translate(self.width() / 2, self.height() / 2)
-        font = QFont(self.value_fontname, self.value_fontsize)
-        fm = QFontMetrics(font)
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.PlainText)
+            static_text.prepare(QTransform(), font)
+            # centered in the same rect the labels were drawn in with drawText
+            center = QRectF(int(x - w / 2), int(y - h / 2), int(w), int(h)).center()
+            size = static_text.size()
+            labels.append((QPointF(center.x() - size.width() / 2, center.y() - size.height() / 2), static_text))
+
+        self.scale_labels = (key, (font, labels))
+        return self.scale_labels[1]
+
+    def create_scale_marker_values_text(self, painter):
+        font, labels = self.get_scale_labels()
 
         pen_shadow = QPen()
-        pen_shadow.setBrush(self.DisplayValueColor)
+        pen_shadow.setBrush(self.ScaleValueColor)
         painter.setPen(pen_shadow)
-
+        painter.setFont(font)
+
+        for position, static_text in labels:
+            painter.drawStaticText(position, static_text)
+
+    def set_value_text_format(self, text_format=None, precision=0):
+        # text_format is a str.format pattern such as "{:+.1f} bar"; without it the value is shown with
+        # precision decimals, or truncated to an integer for precision 0
+        self.value_text_format = text_format
+        self.value_text_precision = precision
+        self.schedule_repaint()
+
+    def get_value_text(self):
+        if self.value_text_format is not None:
+            return self.value_text_format.format(self.value)
+        if self.value_text_precision > 0:
+            return "%.*f" % (self.value_text_precision, self.value)
+        return str(int(self.value))
+
+    def get_value_font_metrics(self):
+        key = (self.value_fontname, self.value_fontsize)
+        if self.value_font_metrics is None or self.value_font_metrics[0] != key:
+            self.value_font_metrics = (key, QFontMetrics(QFont(self.value_fontname, self.value_fontsize)))
+        return self.value_font_metrics[1]
+
+    def get_value_text_rect(self, text):
+        key = (text, self.value_fontname, self.value_fontsize, self.widget_diameter, self.text_radius_factor,
+               self.scale_angle_start_value, self.scale_angle_size)
+        rect = self.value_text_rects.get(key)
+        if rect is None:
+            if len(self.value_text_rects) >= GLYPH_TEXT_CACHE_SIZE:
+                self.value_text_rects.clear()
+            rect = self.value_text_rects[key] = self.create_value_text_rect(text)
+        return rect
+
+    def create_value_text_rect(self, text):
+        fm = self.get_value_font_metrics()
         text_radius = self.widget_diameter / 2 * self.text_radius_factor
-        text = str(int(self.value))
         w = fm.horizontalAdvance(text) + 1  # Use horizontalAdvance instead of width
         h = fm.height()
-        painter.setFont(QFont(self.value_fontname, self.value_fontsize))
 
         angle_end = float(self.scale_angle_start_value + self.scale_angle_size - 360)
         angle = (angle_end - self.scale_angle_start_value) / 2 + self.scale_angle_start_value
 
         x = text_radius * math.cos(math.radians(angle))
         y = text_radius * math.sin(math.radians(angle))
-        painter.drawText(int(x - w / 2), int(y - h / 2), int(w), int(h), Qt.AlignCenter, text)
+        return QRect(int(x - w / 2), int(y - h / 2), int(w), int(h))
 
-    def paintEvent(self, event):
-        if self.enable_filled_Polygon:
-            self.draw_filled_polygon()
+    def get_value_glyph_cache(self, dpr):
+        key = (self.value_fontname, self.value_fontsize, self.DisplayValueColor.rgba(), dpr)
+        if self.value_glyph_cache is None or self.value_glyph_cache[0] != key:
+            font = QFont(self.value_fontname, self.value_fontsize)
+            self.value_glyph_cache = (key, get_glyph_cache(font, self.DisplayValueColor, dpr))
+        return self.value_glyph_cache[1]
 
-        # draw scale marker lines
-        if self.enable_fine_scaled_marker:
-            self.create_fine_scaled_marker()
-        if self.enable_big_scaled_marker:
-            self.draw_big_scaled_markter()
+    def create_values_text(self, painter):
+        text = self.get_value_text()
+        rect = self.get_value_text_rect(text)
 
-        # draw scale marker value text
-        if self.enable_scale_text:
-            self.create_scale_marker_values_text()
+        # glyphs are not cached for the font sizes passed through while resizing
+        if self.enable_glyph_cache and not self.live_resize:
+            self.get_value_glyph_cache(get_device_pixel_ratio(painter)).draw_text(painter, rect, text)
+            return
 
-        # Display Value
-        if self.enable_value_text:
-            self.create_values_text()
+        pen_shadow = QPen()
+        pen_shadow.setBrush(self.DisplayValueColor)
+        painter.setPen(pen_shadow)
+        painter.setFont(QFont(self.value_fontname, self.value_fontsize))
+        painter.drawText(rect, Qt.AlignCenter, text)
+
+    def get_dial_cache_key(self, dpr):
+        # everything the static dial layer depends on; a different key means the cached pixmap is stale
+        return (self.width(), self.height(), dpr, self.widget_diameter,
+                self.enable_filled_Polygon, self.enable_barGraph, self.enable_fine_scaled_marker,
+                self.enable_big_scaled_marker, self.enable_scale_text,
+                self.value_min, self.value_max, self.scala_main_count, self.scala_subdiv_count,
+                self.scale_angle_start_value, self.scale_angle_size, self.angle_offset, self.scale_mapping,
+                self.gauge_color_outer_radius_factor, self.gauge_color_inner_radius_factor,
+                tuple((position, QColor(color).rgba()) for position, color in self.scale_polygon_colors),
+                self.ScaleValueColor.rgba(), self.scale_fontname, self.scale_fontsize)
+
+    def invalidate_dial_cache(self):
+        # also drops the pixmaps from the shared cache, gauges configured alike render them again
+        shared = DialCache.instance()
+        for key, pixmap in self.dial_cache.values():
+            shared.discard_value(pixmap)
+        self.dial_cache = {}
+        self.schedule_repaint()
+
+    def get_layer_paints(self, layers):
+        # what tells layers of other gauges apart in the shared cache: methods of the gauge itself draw from the
+        # state in the dial cache key, anything else is only shared with gauges using the very same callable
+        return tuple(layer.paint.__func__ if getattr(layer.paint, "__self__", None) is self else layer.paint
+                     for layer in layers)
+
+    def get_dial_pixmap(self, layers, dpr=None, wait=True):
+        # without wait, None while the pixmap is being rendered on the thread pool
+        if dpr is None:
+            dpr = self.devicePixelRatioF()
+        names = tuple(layer.name for layer in layers)
+        key = self.get_dial_cache_key(dpr) + names
+        cached = self.dial_cache.get(names)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        # gauges with the same configuration and size share one pixmap
+        shared_key = key + self.get_layer_paints(layers)
+        if self.failed_dial_jobs.get(names) == shared_key:
+            wait = True
+        if not wait and self.dial_jobs.get(names) == shared_key:
+            return None
+        pixmap = DialCache.instance().get(shared_key)
+        if pixmap is None:
+            if not wait and self.submit_dial_job(names, shared_key, layers, dpr):
+                return None
+            pixmap = DialCache.instance().put(shared_key, self.create_dial_pixmap(layers, key, dpr))
+        self.cancel_dial_job(names)
+        self.failed_dial_jobs.pop(names, None)
+        self.dial_cache[names] = (key, pixmap)
+        return pixmap
+
+    def set_enable_async_dial(self, enable=True):
+        """Render changed dials on QThreadPool.globalInstance(), showing the previous dial until they are ready
+
+        Only layers drawn by methods of the gauge are rendered off the GUI thread, from a copy of its state.
+        """
+        self.async_dial = enable
+        if not enable:
+            for names in list(self.dial_jobs):
+                self.cancel_dial_job(names)
+
+    def can_render_off_thread(self, layers):
+        # the copy rendering the dial is a plain AnalogGauge: layers and the methods they call must be its own
+        if get_overridden_gauge_methods(type(self)):
+            return False
+        return all(getattr(layer.paint, "__self__", None) is self and
+                   getattr(AnalogGauge, layer.paint.__name__, None) is layer.paint.__func__ for layer in layers)
+
+    def submit_dial_job(self, names, shared_key, layers, dpr):
+        if not self.can_render_off_thread(layers):
+            return False
+        # a job for an older configuration is stale
+        self.cancel_dial_job(names)
+        self.dial_jobs[names] = shared_key
+        # gauges configured alike wait for the job the first of them submitted
+        if DialJobs.instance().join(shared_key, self.dial_job_finished):
+            return True
+        # the ticks come from the shared cache, which is only used on the GUI thread
+        self.get_scale_ticks()
+        snapshot = GaugeSnapshot(self, dpr)
+        paints = [layer.paint.__func__.__get__(snapshot) for layer in layers]
+        DialJobs.instance().submit(shared_key, lambda: snapshot.create_dial_image(paints, dpr),
+                                   self.dial_job_finished)
+        return True
+
+    def cancel_dial_job(self, names):
+        shared_key = self.dial_jobs.pop(names, None)
+        if shared_key is not None:
+            DialJobs.instance().cancel(shared_key, self.dial_job_finished)
+
+    def dial_job_finished(self, shared_key, pixmap):
+        for names in [names for names, pending in self.dial_jobs.items() if pending == shared_key]:
+            del self.dial_jobs[names]
+            if pixmap is not None:
+                # the shared key is the dial cache key followed by one paint function per layer
+                self.dial_cache[names] = (shared_key[:-len(names)], pixmap)
+            else:
+                self.failed_dial_jobs[names] = shared_key
+        self.schedule_repaint()
+
+    def create_dial_image(self, paints, dpr):
+        # like create_dial_pixmap(), into a QImage, which may be painted outside the GUI thread
+        image = QImage(self.size() * dpr, QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(dpr)
+        image.fill(Qt.transparent)
+        if not image.isNull():
+            painter = QPainter(image)
+            # the image must not be destroyed while it is still being painted, even when a layer raises
+            try:
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.translate(self.width() / 2, self.height() / 2)
+                for paint in paints:
+                    painter.save()
+                    paint(painter)
+                    painter.restore()
+            finally:
+                painter.end()
+        return image
+
+    def create_dial_pixmap(self, layers, key, dpr):
+        pixmap = QPixmap(self.size() * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        if not pixmap.isNull():
+            painter = QPainter(pixmap)
+            try:
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.translate(self.width() / 2, self.height() / 2)
+                profiler = self.paint_profiler
+                for layer in layers:
+                    painter.save()
+                    if profiler is None:
+                        layer.paint(painter)
+                    else:
+                        started = time.perf_counter_ns()
+                        layer.paint(painter)
+                        profiler.record(self, layer.name, time.perf_counter_ns() - started)
+                    painter.restore()
+            finally:
+                painter.end()
+        return pixmap
+
+    def draw_scaled_dial_pixmap(self, painter, cached):
+        # the dial cached at an earlier size, scaled to the current diameter
+        key, pixmap = cached
+        width, height, dpr, diameter = key[:4]
+        scale = self.widget_diameter / diameter
+        # nearest neighbour is good enough for the frames of a drag and twice as fast
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.drawPixmap(QRectF(-width / 2 * scale, -height / 2 * scale, width * scale, height * scale),
+                           pixmap, QRectF(pixmap.rect()))
+
+    def draw_dial_pixmap(self, painter, layers, rect):
+        cached = self.dial_cache.get(tuple(layer.name for layer in layers))
+        usable = cached is not None and cached[0][3] > 0 and not cached[1].isNull()
+        if self.live_resize and usable:
+            self.draw_scaled_dial_pixmap(painter, cached)
+            return
+        # only blit the part of the cached layer inside the repainted rect
+        dial = self.get_dial_pixmap(layers, get_device_pixel_ratio(painter), wait=not (self.async_dial and usable))
+        if dial is None:
+            # the previous dial, scaled to the current size, until the new one is rendered
+            self.draw_scaled_dial_pixmap(painter, cached)
+            return
+        if not dial.isNull():
+            dpr = dial.devicePixelRatio()
+            source = QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+            target = QRectF(rect).translated(-self.width() / 2, -self.height() / 2)
+            painter.drawPixmap(target, dial, source)
+
+    def draw_static_run(self, painter, layers, rect, used_runs):
+        used_runs.add(tuple(layer.name for layer in layers))
+        if self.paint_profiler is None:
+            self.draw_dial_pixmap(painter, layers, rect)
+            return
+        started = time.perf_counter_ns()
+        self.draw_dial_pixmap(painter, layers, rect)
+        self.paint_profiler.record(self, "dial", time.perf_counter_ns() - started)
+
+    def paint_gauge(self, painter, rect):
+        # painter starts at the top left corner of the gauge, rect is the part being repainted
+        profiler = self.paint_profiler
+        if profiler is not None:
+            paint_started = time.perf_counter_ns()
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(self.width() / 2, self.height() / 2)
+
+        # consecutive static layers are blitted from one cached pixmap
+        static_run = []
+        used_runs = set()
+        for layer in self.layers:
+            if not layer.is_active():
+                continue
+            if layer.is_static():
+                static_run.append(layer)
+                continue
+            if static_run:
+                self.draw_static_run(painter, static_run, rect, used_runs)
+                static_run = []
+            if layer.bounds is not None and not layer.bounds().intersects(rect):
+                continue
+            painter.save()
+            if profiler is None:
+                layer.paint(painter)
+            else:
+                started = time.perf_counter_ns()
+                layer.paint(painter)
+                profiler.record(self, layer.name, time.perf_counter_ns() - started)
+            painter.restore()
+        if static_run:
+            self.draw_static_run(painter, static_run, rect, used_runs)
+        painter.restore()
+
+        for names in [names for names in self.dial_cache if names not in used_runs]:
+            del self.dial_cache[names]
+
+        if profiler is not None:
+            profiler.record_paint(self, time.perf_counter_ns() - paint_started)
+
+
+# methods subclasses may override and still have their dial rendered by a GaugeSnapshot
+SNAPSHOT_SAFE_OVERRIDES = ("update", "emit_value_changed")
+overridden_gauge_methods = {}
+SNAPSHOT_VALUE_TYPES = (QColor, QFont, QPen, QBrush, QRegion, QPolygon, QPolygonF, QTransform)
+
+
+def get_overridden_gauge_methods(cls):
+    # names of AnalogGauge methods cls replaces, other than those a GaugeSnapshot does not call
+    overridden = overridden_gauge_methods.get(cls)
+    if overridden is None:
+        overridden = overridden_gauge_methods[cls] = tuple(
+            name for name, value in vars(AnalogGauge).items()
+            if callable(value) and name not in SNAPSHOT_SAFE_OVERRIDES and getattr(cls, name, None) is not value)
+    return overridden
+
+
+def copy_drawing_state(value):
+    # containers and Qt value types are copied, so the copy shares nothing the GUI thread changes in place
+    if isinstance(value, (list, tuple)):
+        return type(value)(copy_drawing_state(item) for item in value)
+    if isinstance(value, dict):
+        return type(value)((key, copy_drawing_state(item)) for key, item in value.items())
+    if isinstance(value, SNAPSHOT_VALUE_TYPES):
+        return type(value)(value)
+    return value
+
+
+class GaugeSnapshot(AnalogGauge):
+    """Copy of the drawing state of a gauge with a fixed size, for rendering its dial on another thread"""
+
+    def __init__(self, gauge, dpr):
+        self.__dict__.update((name, copy_drawing_state(value)) for name, value in gauge.__dict__.items())
+        # QStaticText is not thread-safe, the copy lays out its own labels; pixmaps stay on the GUI thread
+        self.scale_labels = None
+        self.dial_cache = {}
+        self.full_arc_pixmap = None
+        self.value_glyph_cache = None
+        self.paint_profiler = None
+        self.fixed_size = gauge.size()
+        self.fixed_dpr = dpr
+
+    def width(self):
+        return self.fixed_size.width()
+
+    def height(self):
+        return self.fixed_size.height()
+
+    def size(self):
+        return QSize(self.fixed_size)
+
+    def devicePixelRatioF(self):
+        return self.fixed_dpr
+
+    def update(self, region=None):
+        pass
+
+
+class AnalogGaugeWidget(QWidget, AnalogGauge):
+    """Custom analog gauge widget"""
+
+    valueChanged = Signal(int)
+
+    def __init__(self, parent=None):
+        super(AnalogGaugeWidget, self).__init__(parent)
+        self.init_gauge()
+
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_SETTLE_MS)
+        self.resize_timer.timeout.connect(self.end_live_resize)
+
+        self.setMouseTracking(False)
+        self.setWindowTitle("Analog Gauge")
 
-        # draw needle 1
-        if self.enable_Needle_Polygon:
-            self.draw_needle()
+    def emit_value_changed(self, value):
+        self.valueChanged.emit(value)
 
-        if self.enable_CenterPoint:
-            self.draw_big_needle_center_point(diameter=(self.widget_diameter / 6))
+    def set_resize_settle_delay(self, msec=RESIZE_SETTLE_MS):
+        # 0 rebuilds the cached layers on every resize
+        self.resize_timer.setInterval(msec)
 
+    def resizeEvent(self, event):
+        self.rescale_method()
+        if self.resize_timer.interval() > 0 and self.isVisible() and self.dial_cache:
+            self.begin_live_resize()
+            self.resize_timer.start()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            self.paint_gauge(painter, event.rect())
+        finally:
+            painter.end()
 
 if __name__ == '__main__':
     def main():
@@ -0,0 +1,245 @@
+###
+# Batch export of value timelines to numbered image frames.
+#
+# Frames are split into contiguous chunks and rendered by a pool of worker processes, each with its own offscreen
+# QApplication and widget, so painting scales with the number of cores instead of running on one GUI thread.
+# Workers are started with the "spawn" method, Qt does not survive fork.
+#
+
+import math
+import os
+import sys
+import time
+from collections import deque
+import multiprocessing
+import numpy as np
+
+# rough resident size of a worker with Qt loaded, used to cap the number of workers
+WORKER_BASE_MEMORY = 80 * 1024 * 1024
+MAX_CHUNK_SIZE = 256
+FORMATS = ("png", "rgba")
+
+worker_widget = None
+worker_job = None
+
+
+def resample_timeline(timestamps, values, fps, mode="hold"):
+    # one value per frame at a constant frame rate; "hold" shows the last sample at or before the frame time,
+    # "linear" interpolates between samples
+    if mode not in ("hold", "linear"):
+        raise ValueError("unknown resample mode %r" % mode)
+    if fps <= 0:
+        raise ValueError("fps must be positive, got %r" % fps)
+    timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+    values = np.asarray(values, dtype=np.float64).ravel()
+    if len(timestamps) != len(values):
+        raise ValueError("got %d timestamps for %d values" % (len(timestamps), len(values)))
+    if not len(values):
+        return values
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    values = values[order]
+
+    frame_times = timestamps[0] + np.arange(int(math.floor((timestamps[-1] - timestamps[0]) * fps)) + 1) / fps
+    if mode == "linear":
+        return np.interp(frame_times, timestamps, values)
+    return values[np.searchsorted(timestamps, frame_times, side="right") - 1]
+
+
+def get_frame_path(output_dir, prefix, index, image_format):
+    return os.path.join(output_dir, "%s_%06d.%s" % (prefix, index, image_format))
+
+
+def init_worker(job):
+    global worker_widget, worker_job
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    import offscreen
+
+    worker_job = job
+    worker_widget = offscreen.create_widget(job["kind"], **job["kwargs"])
+    if job["setup"] is not None:
+        job["setup"](worker_widget)
+
+
+def render_chunk(start, values):
+    # the widget lives for the whole export, so its dial and glyph caches are reused across chunks
+    import offscreen
+    from PySide6.QtGui import QColor, QImage
+
+    job = worker_job
+    background = QColor(job["background"])
+    frames = []
+    images = offscreen.iter_render_states(worker_widget, values, job["size"], job["dpr"], background)
+    for index, image in enumerate(images, start):
+        if job["image_format"] == "png":
+            if not image.save(get_frame_path(job["output_dir"], job["prefix"], index, "png")):
+                raise IOError("could not write frame %d" % index)
+            continue
+        # keep the converted image referenced while its bits are copied
+        rgba = image.convertToFormat(QImage.Format_RGBA8888)
+        data = bytes(rgba.constBits())
+        if job["stream"]:
+            frames.append(data)
+        else:
+            with open(get_frame_path(job["output_dir"], job["prefix"], index, "rgba"), "wb") as frame_file:
+                frame_file.write(data)
+    return b"".join(frames)
+
+
+def export_frames(
+    kind,
+    values,
+    output_dir,
+    image_format="png",
+    size=(400, 400),
+    dpr=1.0,
+    background="transparent",
+    workers=None,
+    max_memory=None,
+    chunk_size=None,
+    prefix="frame",
+    stream=None,
+    setup=None,
+    progress=None,
+    **kwargs,
+):
+    """Render one frame per value with a pool of offscreen workers
+
+    kind is a widget kind of offscreen.WIDGET_TYPES, kwargs go to its constructor and setup, a picklable function
+    taking the widget, configures it in every worker. PNG and raw RGBA (8 bit, not premultiplied) frames are
+    written to output_dir as prefix_000000.png, ...; with stream, a binary file object, raw RGBA frames are
+    written back to back into it in frame order instead. max_memory (bytes) caps the number of workers and the
+    frames in flight. Returns a dict with frames, seconds, fps and workers.
+    """
+    if image_format not in FORMATS:
+        raise ValueError("unknown image format %r, expected one of %s" % (image_format, ", ".join(FORMATS)))
+    if stream is not None and image_format != "rgba":
+        raise ValueError("only rgba frames can be streamed")
+    values = np.asarray(values, dtype=np.float64).ravel()
+    count = len(values)
+    if stream is None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    frame_bytes = int(math.ceil(size[0] * dpr) * math.ceil(size[1] * dpr) * 4)
+    workers = min(workers or os.cpu_count() or 1, max(1, count))
+    if chunk_size is None:
+        # a few chunks per worker keeps them busy until the end without losing cache locality
+        chunk_size = min(MAX_CHUNK_SIZE, max(1, int(math.ceil(count / (workers * 4)))))
+    if max_memory is not None:
+        if stream is not None:
+            # every chunk in flight is held in memory until it is written
+            chunk_size = max(1, min(chunk_size, max_memory // (4 * frame_bytes)))
+        per_worker = WORKER_BASE_MEMORY + (2 * chunk_size * frame_bytes if stream is not None else frame_bytes)
+        workers = max(1, min(workers, max_memory // per_worker))
+
+    job = {
+        "kind": kind,
+        "kwargs": kwargs,
+        "setup": setup,
+        "size": tuple(size),
+        "dpr": dpr,
+        "background": background,
+        "image_format": image_format,
+        "output_dir": output_dir,
+        "prefix": prefix,
+        "stream": stream is not None,
+    }
+    chunks = [(start, values[start : start + chunk_size]) for start in range(0, count, chunk_size)]
+
+    started = time.perf_counter()
+    done = 0
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=init_worker, initargs=(job,)) as pool:
+        # a bounded window of chunks in flight, collected in order so streamed frames stay in sequence
+        pending = deque()
+        chunks = iter(chunks)
+        while True:
+            while len(pending) < 2 * workers:
+                item = next(chunks, None)
+                if item is None:
+                    break
+                start, chunk = item
+                pending.append((len(chunk), pool.apply_async(render_chunk, (start, chunk))))
+            if not pending:
+                break
+            length, result = pending.popleft()
+            data = result.get()
+            if stream is not None:
+                stream.write(data)
+            done += length
+            if progress is not None:
+                progress(done, count)
+
+    seconds = time.perf_counter() - started
+    return {"frames": count, "seconds": seconds, "fps": count / seconds if seconds > 0 else 0.0, "workers": workers}
+
+
+def load_values(path):
+    # .npy or text/CSV with one value per line or timestamp,value rows
+    if path.endswith(".npy"):
+        data = np.load(path)
+    else:
+        data = np.loadtxt(path, delimiter="," if path.endswith(".csv") else None, ndmin=1)
+    return np.asarray(data, dtype=np.float64)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render a value timeline to numbered frames with a process pool")
+    parser.add_argument("values", help=".npy, .csv or text file with values or timestamp,value rows")
+    parser.add_argument("output", help="output directory, or a file for --format rgba --stream ('-' for stdout)")
+    parser.add_argument("--kind", default="gauge", help="gauge, led, switch_control or switch")
+    parser.add_argument("--format", default="png", choices=FORMATS)
+    parser.add_argument("--stream", action="store_true", help="write raw rgba frames back to back into one file")
+    parser.add_argument("--size", type=int, nargs=2, default=(400, 400), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--dpr", type=float, default=1.0)
+    parser.add_argument("--background", default="transparent")
+    parser.add_argument("--fps", type=float, help="resample timestamp,value rows to this frame rate")
+    parser.add_argument("--interpolate", action="store_true", help="interpolate when resampling instead of hold")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--max-memory", type=int, help="memory budget in MiB")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--prefix", default="frame")
+    args = parser.parse_args(argv)
+
+    data = load_values(args.values)
+    if data.ndim == 2:
+        if args.fps is None:
+            values = data[:, -1]
+        else:
+            values = resample_timeline(data[:, 0], data[:, 1], args.fps, "linear" if args.interpolate else "hold")
+    else:
+        values = data
+
+    def report(done, count):
+        sys.stderr.write("\r%d/%d frames" % (done, count))
+        sys.stderr.flush()
+
+    options = dict(
+        image_format=args.format,
+        size=args.size,
+        dpr=args.dpr,
+        background=args.background,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        prefix=args.prefix,
+        progress=report,
+        max_memory=args.max_memory * 1024 * 1024 if args.max_memory else None,
+    )
+    if args.stream:
+        if args.output == "-":
+            stats = export_frames(args.kind, values, None, stream=sys.stdout.buffer, **options)
+        else:
+            with open(args.output, "wb") as stream:
+                stats = export_frames(args.kind, values, None, stream=stream, **options)
+    else:
+        stats = export_frames(args.kind, values, args.output, **options)
+    sys.stderr.write(
+        "\nrendered %d frames in %.2f s (%.1f fps) with %d workers\n"
+        % (stats["frames"], stats["seconds"], stats["fps"], stats["workers"])
+    )
+
+
+if __name__ == "__main__":
+    main()
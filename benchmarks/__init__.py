@@ -0,0 +1,5 @@
+###
+# Paint and update throughput benchmarks for the widgets in this package.
+#
+# Run from the repository root with "python -m benchmarks"; see "python -m benchmarks --help".
+#
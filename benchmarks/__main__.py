@@ -0,0 +1,84 @@
+import os
+import sys
+
+# headless by default, QT_QPA_PLATFORM in the environment still wins
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def parse_override(text):
+    pattern, separator, value = text.rpartition("=")
+    if not separator:
+        raise ValueError("expected PATTERN=THRESHOLD, got %r" % text)
+    return pattern, float(value)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Paint and update throughput benchmarks")
+    parser.add_argument("patterns", nargs="*", help="run only benchmarks matching these names or fnmatch patterns")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--output", "-o", help="write JSON results to this file ('-' for stdout)")
+    parser.add_argument("--baseline", "-b", help="compare with the JSON results of an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed relative slowdown of the median before failing (default 0.1)",
+    )
+    parser.add_argument(
+        "--threshold-for",
+        action="append",
+        default=[],
+        type=parse_override,
+        metavar="PATTERN=T",
+        help="threshold for benchmarks matching an fnmatch pattern, may be repeated",
+    )
+    parser.add_argument("--min-runs", type=int, default=20)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per benchmark")
+    parser.add_argument("--quick", action="store_true", help="few runs per benchmark, for smoke tests")
+    args = parser.parse_args(argv)
+
+    from offscreen import ensure_application
+    from benchmarks import runner, scenarios  # noqa: F401, registers the scenarios
+
+    ensure_application()
+
+    names = runner.select(args.patterns)
+    if args.list:
+        for name in names:
+            print(name)
+        return 0
+    if not names:
+        sys.stderr.write("no benchmark matches %s\n" % " ".join(args.patterns))
+        return 2
+    if args.quick:
+        args.min_runs, args.min_time = 3, 0.0
+
+    def report(name, result):
+        sys.stderr.write(
+            "%-45s %10.1f us/%s (p90 %.1f, %d runs)\n"
+            % (name, result["median_us"], result["unit"], result["p90_us"], result["runs"])
+        )
+
+    results = runner.run(names, args.min_runs, args.min_time, report)
+    if args.output:
+        runner.save_results(args.output, results)
+
+    if args.baseline:
+        rows = runner.compare(results, runner.load_results(args.baseline), args.threshold, args.threshold_for)
+        regressions = [row for row in rows if row[5]]
+        sys.stderr.write("\n%-45s %10s %10s %8s\n" % ("benchmark", "baseline", "current", "change"))
+        for name, before, after, change, limit, regressed in rows:
+            sys.stderr.write(
+                "%-45s %10.1f %10.1f %+7.1f%%%s\n"
+                % (name, before, after, change * 100, "  REGRESSION (> %+.0f%%)" % (limit * 100) if regressed else "")
+            )
+        if regressions:
+            sys.stderr.write("\n%d of %d benchmarks regressed\n" % (len(regressions), len(rows)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
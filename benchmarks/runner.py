@@ -0,0 +1,127 @@
+###
+# Timing, registry and baseline comparison of the benchmarks.
+#
+
+import fnmatch
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+benchmarks = {}
+
+
+class Benchmark(object):
+    """One registered scenario; setup() returns the function that is timed, called once per operation"""
+
+    def __init__(self, name, setup, unit="paint"):
+        self.name = name
+        self.setup = setup
+        self.unit = unit
+
+
+def benchmark(name, unit="paint"):
+    def register(setup):
+        if name in benchmarks:
+            raise ValueError("benchmark %r already exists" % name)
+        benchmarks[name] = Benchmark(name, setup, unit)
+        return setup
+
+    return register
+
+
+def measure(operation, min_runs=20, min_time=0.2, warmup=3):
+    # per operation timings in microseconds; runs until both min_runs and min_time are reached
+    for _ in range(warmup):
+        operation()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_runs or time.perf_counter() - started < min_time:
+        begin = time.perf_counter_ns()
+        operation()
+        timings.append((time.perf_counter_ns() - begin) / 1000)
+    timings = np.array(timings)
+    return {
+        "runs": len(timings),
+        "median_us": float(np.median(timings)),
+        "mean_us": float(timings.mean()),
+        "p90_us": float(np.percentile(timings, 90)),
+        "min_us": float(timings.min()),
+    }
+
+
+def select(patterns=None):
+    names = sorted(benchmarks)
+    if not patterns:
+        return names
+    return [name for name in names if any(fnmatch.fnmatch(name, pattern) or pattern in name for pattern in patterns)]
+
+
+def run(names, min_runs=20, min_time=0.2, progress=None):
+    results = {}
+    for name in names:
+        entry = benchmarks[name]
+        operation = entry.setup()
+        result = measure(operation, min_runs, min_time)
+        result["unit"] = entry.unit
+        results[name] = result
+        if progress is not None:
+            progress(name, result)
+    return results
+
+
+def get_metadata():
+    import PySide6
+    from PySide6.QtGui import QGuiApplication
+
+    return {
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "qpa_platform": QGuiApplication.platformName(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path, results):
+    document = {"metadata": get_metadata(), "results": results}
+    if path == "-":
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return
+    with open(path, "w") as result_file:
+        json.dump(document, result_file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as result_file:
+        return json.load(result_file)["results"]
+
+
+def get_threshold(name, threshold, overrides):
+    # the last matching override wins
+    for pattern, value in reversed(overrides):
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return threshold
+
+
+def compare(results, baseline, threshold=0.1, overrides=(), metric="median_us"):
+    """Compare results with a baseline; a benchmark regresses when metric grows by more than its threshold
+
+    threshold is relative (0.1 allows 10% slower), overrides is a list of (fnmatch pattern, threshold).
+    Returns a list of (name, baseline, current, change, threshold, regressed) for benchmarks in both.
+    """
+    rows = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        before = baseline[name][metric]
+        after = results[name][metric]
+        change = (after - before) / before if before > 0 else 0.0
+        limit = get_threshold(name, threshold, overrides)
+        rows.append((name, before, after, change, limit, change > limit))
+    return rows
@@ -0,0 +1,213 @@
+###
+# The benchmark scenarios. Every setup function builds its widgets and returns the operation that is timed.
+#
+
+import itertools
+import numpy as np
+from PySide6.QtWidgets import QApplication, QWidget, QGridLayout
+from PySide6.QtGui import QImage
+from PySide6.QtCore import Qt, QPropertyAnimation
+from analoggaugewidget import AnalogGaugeWidget
+from gaugecanvas import GaugeCanvas
+from QLed import QLed
+from SwitchControl import SwitchControl
+from switch_button import Switch
+from benchmarks.runner import benchmark
+
+GAUGE_DIAMETERS = (100, 200, 400, 800)
+# flags that each turn one layer off; enable_barGraph is not one of them, off it switches the colored arc to a bar
+# following the value, which is benchmarked as a mode of its own
+GAUGE_LAYER_FLAGS = (
+    "enable_filled_Polygon",
+    "enable_fine_scaled_marker",
+    "enable_big_scaled_marker",
+    "enable_scale_text",
+    "enable_value_text",
+    "enable_CenterPoint",
+    "enable_Needle_Polygon",
+)
+LED_SHAPES = {QLed.Circle: "circle", QLed.Round: "round", QLed.Square: "square", QLed.Triangle: "triangle"}
+LED_COLOURS = {
+    QLed.Red: "red",
+    QLed.Green: "green",
+    QLed.Yellow: "yellow",
+    QLed.Grey: "grey",
+    QLed.Orange: "orange",
+    QLed.Purple: "purple",
+    QLed.Blue: "blue",
+}
+DASHBOARD_SIZES = (16, 64)
+DASHBOARD_CELL = 100
+# one animation step per 60 Hz frame
+FRAME_MS = 16
+
+
+def create_values(count, low=0, high=1000, seed=0):
+    # a random walk, so the needle moves like a real signal instead of jumping across the scale
+    steps = np.random.default_rng(seed).normal(0, (high - low) / 50, count)
+    return np.clip((high + low) / 2 + np.cumsum(steps), low, high)
+
+
+def render_loop(widget, apply, states):
+    image = QImage(widget.size(), QImage.Format_ARGB32_Premultiplied)
+    states = itertools.cycle(states)
+
+    def paint():
+        apply(next(states))
+        image.fill(Qt.transparent)
+        widget.render(image)
+
+    return paint
+
+
+def setup_gauge_paint(diameter, disabled_flag=None, value_bar=False):
+    gauge = AnalogGaugeWidget()
+    gauge.resize(diameter, diameter)
+    gauge.rescale_method()
+    if disabled_flag is not None:
+        setattr(gauge, disabled_flag, False)
+    if value_bar:
+        gauge.set_enable_barGraph(False)
+    return render_loop(gauge, gauge.update_value, create_values(500))
+
+
+def setup_gauge_update(diameter):
+    # value changes on a shown widget, painted by Qt with the partial repaint regions
+    gauge = AnalogGaugeWidget()
+    gauge.resize(diameter, diameter)
+    gauge.rescale_method()
+    gauge.show()
+    QApplication.processEvents()
+    values = itertools.cycle(create_values(500))
+
+    def update():
+        gauge.update_value(next(values))
+        QApplication.processEvents()
+
+    return update
+
+
+def setup_led_paint(shape, colour):
+    led = QLed(shape=shape, onColour=colour)
+    led.resize(led.sizeHint())
+    return render_loop(led, led.setValue, (True, False))
+
+
+def iter_switch_control_frames(switch):
+    while True:
+        switch.start_animation(not switch.isChecked())
+        for elapsed in range(0, switch.animation.duration() + FRAME_MS, FRAME_MS):
+            switch.animation.setCurrentTime(min(elapsed, switch.animation.duration()))
+            yield
+
+
+def iter_switch_frames(switch):
+    # the same animation Switch.mouseReleaseEvent runs
+    animation = QPropertyAnimation(switch, b"offset", switch)
+    animation.setDuration(120)
+    while True:
+        start = switch.offset
+        switch.setChecked(not switch.isChecked())
+        animation.setStartValue(start)
+        animation.setEndValue(switch.offset)
+        for elapsed in range(0, animation.duration() + FRAME_MS, FRAME_MS):
+            animation.setCurrentTime(min(elapsed, animation.duration()))
+            yield
+
+
+def setup_switch_toggle(switch_type):
+    switch = switch_type()
+    switch.resize(switch.sizeHint())
+    if switch_type is SwitchControl:
+        frames = iter_switch_control_frames(switch)
+    else:
+        frames = iter_switch_frames(switch)
+    return render_loop(switch, lambda frame: None, frames)
+
+
+def create_dashboard(count):
+    columns = int(np.ceil(np.sqrt(count)))
+    window = QWidget()
+    layout = QGridLayout(window)
+    layout.setContentsMargins(0, 0, 0, 0)
+    layout.setSpacing(0)
+    gauges = []
+    for index in range(count):
+        gauge = AnalogGaugeWidget()
+        gauge.setFixedSize(DASHBOARD_CELL, DASHBOARD_CELL)
+        gauge.rescale_method()
+        layout.addWidget(gauge, index // columns, index % columns)
+        gauges.append(gauge)
+    window.show()
+    QApplication.processEvents()
+    return window, gauges
+
+
+def setup_dashboard_widgets(count):
+    # every frame each gauge gets a new value, then Qt paints the dirty regions
+    window, gauges = create_dashboard(count)
+    values = itertools.cycle(np.column_stack([create_values(500, seed=seed) for seed in range(count)]))
+
+    def frame():
+        for gauge, value in zip(gauges, next(values)):
+            gauge.update_value(value)
+        QApplication.processEvents()
+
+    frame.window = window
+    return frame
+
+
+def setup_dashboard_feed(count, samples=100):
+    # every frame each gauge is fed a chunk of samples it reduces to one value
+    window, gauges = create_dashboard(count)
+    chunks = itertools.cycle(create_values(500 * samples).reshape(500, samples))
+
+    def frame():
+        chunk = next(chunks)
+        for gauge in gauges:
+            gauge.feed_values(chunk, mode="mean")
+        QApplication.processEvents()
+
+    frame.window = window
+    return frame
+
+
+def setup_dashboard_canvas(count):
+    columns = int(np.ceil(np.sqrt(count)))
+    canvas = GaugeCanvas(count=count, columns=columns)
+    canvas.resize(columns * DASHBOARD_CELL, int(np.ceil(count / columns)) * DASHBOARD_CELL)
+    canvas.show()
+    QApplication.processEvents()
+    values = itertools.cycle(np.column_stack([create_values(500, seed=seed) for seed in range(count)]))
+
+    def frame():
+        canvas.set_values(next(values))
+        QApplication.processEvents()
+
+    return frame
+
+
+for _diameter in GAUGE_DIAMETERS:
+    benchmark("gauge.paint.%d.all" % _diameter)(lambda diameter=_diameter: setup_gauge_paint(diameter))
+    for _flag in GAUGE_LAYER_FLAGS:
+        benchmark("gauge.paint.%d.no_%s" % (_diameter, _flag[len("enable_") :].lower()))(
+            lambda diameter=_diameter, flag=_flag: setup_gauge_paint(diameter, flag)
+        )
+    benchmark("gauge.paint.%d.value_bar" % _diameter)(
+        lambda diameter=_diameter: setup_gauge_paint(diameter, value_bar=True)
+    )
+    benchmark("gauge.update.%d" % _diameter, unit="update")(lambda diameter=_diameter: setup_gauge_update(diameter))
+
+for _shape, _shape_name in LED_SHAPES.items():
+    for _colour, _colour_name in LED_COLOURS.items():
+        benchmark("led.paint.%s.%s" % (_shape_name, _colour_name))(
+            lambda shape=_shape, colour=_colour: setup_led_paint(shape, colour)
+        )
+
+benchmark("switch_control.toggle", unit="frame")(lambda: setup_switch_toggle(SwitchControl))
+benchmark("switch.toggle", unit="frame")(lambda: setup_switch_toggle(Switch))
+
+for _count in DASHBOARD_SIZES:
+    benchmark("dashboard.widgets.%d" % _count, unit="frame")(lambda count=_count: setup_dashboard_widgets(count))
+    benchmark("dashboard.feed.%d" % _count, unit="frame")(lambda count=_count: setup_dashboard_feed(count))
+    benchmark("dashboard.canvas.%d" % _count, unit="frame")(lambda count=_count: setup_dashboard_canvas(count))
@@ -0,0 +1,110 @@
+###
+# Process-wide cache of rendered dial layers and scale geometry.
+#
+# Gauges with the same configuration and size render the same static layers. The first one renders them and the
+# others take the result from this cache: a dashboard of identical gauges rasterizes its dial once, and all of them
+# share one pixmap in memory. Entries are keyed by everything they depend on and evicted least recently used first
+# once their total size exceeds the budget in bytes. Gauges keep the pixmaps they show, so an eviction only means
+# that the next gauge configured like that renders its dial again.
+#
+
+from collections import OrderedDict
+from PySide6.QtGui import QPixmap, QImage
+
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def get_cost(value):
+    # bytes held by a cached value: pixmaps, images, NumPy arrays and tuples of them
+    if isinstance(value, (QPixmap, QImage)):
+        return value.width() * value.height() * max(value.depth(), 8) // 8
+    if isinstance(value, tuple):
+        return sum(get_cost(item) for item in value)
+    return getattr(value, "nbytes", 0)
+
+
+class DialCache(object):
+    """LRU cache shared by all gauges of the process, bounded by a budget in bytes; a budget of 0 disables it"""
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        # key -> (value, cost), least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        self.budget = 0
+        self.set_budget(budget)
+        self.reset_stats()
+
+    def set_budget(self, budget):
+        if budget < 0:
+            raise ValueError("budget must not be negative, got %r" % budget)
+        self.budget = budget
+        self.evict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        self.discard(key)
+        cost = get_cost(value)
+        # larger than the whole budget, the caller keeps it for itself
+        if cost <= self.budget:
+            self.entries[key] = (value, cost)
+            self.size += cost
+            self.evict()
+        return value
+
+    def get_or_create(self, key, create):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, create())
+        return value
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def discard_value(self, value):
+        for key in [key for key, entry in self.entries.items() if entry[0] is value]:
+            self.discard(key)
+
+    def evict(self):
+        while self.size > self.budget and self.entries:
+            key, (value, cost) = self.entries.popitem(last=False)
+            self.size -= cost
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "budget": self.budget,
+        }
@@ -0,0 +1,129 @@
+###
+# Rendering of static dial layers on a QThreadPool.
+#
+# Painting into a QImage is allowed outside the GUI thread. A gauge whose dial has to be rebuilt, after a resize or
+# a configuration change, submits its static layers as a job and keeps showing its previous dial until the image is
+# ready; the GUI thread then turns the image into a pixmap, stores it in the shared DialCache and swaps it in. Jobs
+# are keyed by the shared dial cache key, so gauges configured alike wait for one job, and a job nobody waits for
+# any more is canceled.
+#
+
+import logging
+import shiboken6
+from PySide6.QtGui import QPixmap
+from PySide6.QtCore import QObject, QThreadPool, QCoreApplication, QDeadlineTimer, QEventLoop, Signal
+from dialcache import DialCache
+
+logger = logging.getLogger(__name__)
+
+# wait() processes events in between, a job raising an error may need the GUI thread to format it
+WAIT_SLICE_MS = 10
+
+
+class DialJob(object):
+    """Calls render() on a pool thread; render returns the QImage of the dial
+
+    The pool only holds run() while it is queued or running, the job itself is referenced by DialJobs until it is
+    finished or canceled, and then lets go of its image and of render, which holds a copy of the gauge state.
+    """
+
+    def __init__(self, key, render, jobs):
+        self.key = key
+        self.render = render
+        self.jobs = jobs
+        self.canceled = False
+        self.image = None
+
+    def run(self):
+        render = self.render
+        if not self.canceled and render is not None:
+            try:
+                self.image = render()
+            except Exception:
+                # the waiting gauges then render the dial themselves on the GUI thread
+                logger.exception("rendering a dial on the thread pool failed")
+        self.jobs.jobFinished.emit(self)
+
+
+class DialJobs(QObject):
+    """Dial rendering jobs of all gauges of the process"""
+
+    # emitted on the pool thread, delivered on the GUI thread
+    jobFinished = Signal(object)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None or not shiboken6.isValid(cls._instance):
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, pool=None, parent=None):
+        super(DialJobs, self).__init__(parent)
+        self.pool = pool if pool is not None else QThreadPool.globalInstance()
+        # key -> (job, callbacks waiting for it)
+        self.jobs = {}
+        self.jobFinished.connect(self.finish_job)
+
+    def submit(self, key, render, callback):
+        # callback(key, pixmap) runs on the GUI thread; pixmap is None when the job failed
+        if self.join(key, callback):
+            return self.jobs[key][0]
+        job = DialJob(key, render, self)
+        self.jobs[key] = (job, [callback])
+        self.pool.start(job.run)
+        return job
+
+    def join(self, key, callback):
+        # wait for the pending job for key, if there is one
+        entry = self.jobs.get(key)
+        if entry is None:
+            return False
+        if callback not in entry[1]:
+            entry[1].append(callback)
+        return True
+
+    def cancel(self, key, callback):
+        entry = self.jobs.get(key)
+        if entry is None:
+            return
+        job, callbacks = entry
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            del self.jobs[key]
+            # a queued job still runs, but returns right away
+            job.canceled = True
+            job.render = None
+
+    def is_pending(self, key):
+        return key in self.jobs
+
+    def finish_job(self, job):
+        image = job.image
+        job.image = None
+        job.render = None
+        entry = self.jobs.get(job.key)
+        if entry is None or entry[0] is not job:
+            # canceled, or replaced by a newer job for the same key
+            return
+        del self.jobs[job.key]
+        pixmap = None
+        if image is not None:
+            pixmap = DialCache.instance().put(job.key, QPixmap.fromImage(image))
+        for callback in entry[1]:
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, QObject) and not shiboken6.isValid(owner):
+                continue
+            callback(job.key, pixmap)
+
+    def wait(self, msecs=-1):
+        # block until the pool is idle and the finished jobs are swapped in; True when all of them were
+        deadline = QDeadlineTimer(msecs)
+        done = self.pool.waitForDone(WAIT_SLICE_MS)
+        while not done and not deadline.hasExpired():
+            QCoreApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+            done = self.pool.waitForDone(WAIT_SLICE_MS)
+        QCoreApplication.sendPostedEvents(self)
+        return done
@@ -0,0 +1,88 @@
+###
+# Shared frame clock for the gauges and controls in this package.
+#
+# Instead of every widget running its own repaint timer, widgets mark themselves dirty and one process-wide
+# timer repaints them on the next frame. The timer stops as soon as nothing is dirty, so idle dashboards cost
+# nothing.
+#
+
+import logging
+import shiboken6
+from PySide6.QtCore import Qt, QObject, QTimer, QElapsedTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class FrameClock(QObject):
+    """Process-wide timer that runs queued frame callbacks once per frame"""
+
+    # seconds since the previous frame
+    tick = Signal(float)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None or not shiboken6.isValid(cls._instance):
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, rate=60, parent=None):
+        super(FrameClock, self).__init__(parent)
+        self.pending = {}
+        self.delta = 0.0
+        self.frame_count = 0
+
+        self.elapsed = QElapsedTimer()
+        self.elapsed.start()
+        self.last_frame_ns = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.run_frame)
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        if rate <= 0:
+            raise ValueError("frame rate must be positive, got %r" % rate)
+        self.rate = rate
+        self.timer.setInterval(max(1, int(round(1000 / rate))))
+
+    def request_frame(self, callback):
+        # callbacks are deduplicated, requesting the same bound method twice runs it once
+        self.pending[callback] = None
+        if not self.timer.isActive():
+            # measure the first frame after idling from now, not from the last frame before the pause
+            self.last_frame_ns = self.elapsed.nsecsElapsed() - self.timer.interval() * 1000000
+            self.timer.start()
+
+    def cancel_frame(self, callback):
+        self.pending.pop(callback, None)
+
+    def mark_dirty(self, widget):
+        self.request_frame(widget.update)
+
+    def run_frame(self):
+        now = self.elapsed.nsecsElapsed()
+        self.delta = (now - self.last_frame_ns) / 1e9
+        self.last_frame_ns = now
+        self.frame_count += 1
+
+        # callbacks may request the next frame while this one runs
+        pending, self.pending = self.pending, {}
+        for callback in pending:
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, QObject) and not shiboken6.isValid(owner):
+                continue
+            # one failing widget must not stall the other callbacks of the frame
+            try:
+                callback()
+            except Exception:
+                logger.exception("frame callback %r failed", callback)
+        self.tick.emit(self.delta)
+
+        if not self.pending:
+            self.timer.stop()
+
+    def is_idle(self):
+        return not self.timer.isActive()
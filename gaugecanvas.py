@@ -0,0 +1,207 @@
+###
+# Many analog gauges drawn by one widget.
+#
+# Every AnalogGaugeWidget is a QWidget with its own paint event and its own backing store. A dashboard with dozens of
+# gauges instead puts lightweight GaugeModels on one GaugeCanvas: the canvas paints all of them in one paintEvent,
+# gauges with the same configuration and cell size share one cached dial pixmap, and value changes only repaint
+# the needles and readouts that moved.
+#
+
+import math
+import numpy as np
+import shiboken6
+from PySide6.QtWidgets import QWidget, QApplication
+from PySide6.QtGui import QPainter, QRegion
+from PySide6.QtCore import QRect, QTimer, Signal
+from analoggaugewidget import AnalogGauge, RESIZE_SETTLE_MS
+from frameclock import FrameClock
+
+
+class GaugeModel(AnalogGauge):
+    """Analog gauge without a widget of its own, painted into a cell of a GaugeCanvas
+
+    Has the same configuration and value API as AnalogGaugeWidget.
+    """
+
+    def __init__(self, canvas=None):
+        self.canvas = None
+        self.index = -1
+        self.cell = QRect()
+        self.init_gauge()
+        if canvas is not None:
+            canvas.add_gauge(self)
+
+    def width(self):
+        return self.cell.width()
+
+    def height(self):
+        return self.cell.height()
+
+    def size(self):
+        return self.cell.size()
+
+    def devicePixelRatioF(self):
+        if self.canvas is None:
+            return 1.0
+        return self.canvas.devicePixelRatioF()
+
+    def update(self, region=None):
+        # frame callbacks may still arrive after the canvas was deleted
+        if self.canvas is not None and shiboken6.isValid(self.canvas):
+            self.canvas.update_gauge(self, region)
+
+    def emit_value_changed(self, value):
+        if self.canvas is not None and shiboken6.isValid(self.canvas):
+            self.canvas.valueChanged.emit(self.index, value)
+
+
+class GaugeCanvas(QWidget):
+    """Widget painting a grid of GaugeModels in one paint event"""
+
+    # gauge index, value
+    valueChanged = Signal(int, int)
+    # emitted once per set_values() call that changed anything
+    valuesChanged = Signal()
+
+    def __init__(self, count=0, columns=4, parent=None):
+        super(GaugeCanvas, self).__init__(parent)
+        self.gauges = []
+        self.columns = max(1, columns)
+        # while set_values() runs, the repaints the gauges ask for, in canvas coordinates
+        self.collected_region = None
+
+        # one timer ends the live resize of all gauges
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_SETTLE_MS)
+        self.resize_timer.timeout.connect(self.end_live_resize)
+
+        for _ in range(count):
+            self.add_gauge()
+
+        self.setWindowTitle("Gauge Canvas")
+
+    def add_gauge(self, gauge=None):
+        if gauge is None:
+            gauge = GaugeModel()
+        if gauge.canvas is not None:
+            gauge.canvas.remove_gauge(gauge)
+        gauge.canvas = self
+        self.gauges.append(gauge)
+        self.relayout()
+        return gauge
+
+    def remove_gauge(self, gauge):
+        self.gauges.remove(gauge)
+        clock = FrameClock.instance()
+        for callback in (gauge.flush_repaint, gauge.flush_pending_update, gauge.step_needle):
+            clock.cancel_frame(callback)
+        gauge.stop_marker_refresh()
+        gauge.canvas = None
+        gauge.index = -1
+        self.relayout()
+
+    def set_columns(self, columns):
+        self.columns = max(1, columns)
+        self.relayout()
+
+    def relayout(self):
+        count = len(self.gauges)
+        columns = max(1, min(self.columns, count))
+        rows = max(1, int(math.ceil(count / columns)))
+        cell_width = self.width() // columns
+        cell_height = self.height() // rows
+        for index, gauge in enumerate(self.gauges):
+            gauge.index = index
+            gauge.cell = QRect(
+                (index % columns) * cell_width, (index // columns) * cell_height, cell_width, cell_height
+            )
+            gauge.rescale_method()
+        self.update()
+
+    def set_resize_settle_delay(self, msec=RESIZE_SETTLE_MS):
+        # 0 rebuilds the cached dials on every resize
+        self.resize_timer.setInterval(msec)
+
+    def resizeEvent(self, event):
+        self.relayout()
+        # while the window is dragged the gauges draw their dials scaled, they are rebuilt once the size settles
+        if self.resize_timer.interval() > 0 and self.isVisible() and any(gauge.dial_cache for gauge in self.gauges):
+            for gauge in self.gauges:
+                gauge.begin_live_resize()
+            self.resize_timer.start()
+
+    def end_live_resize(self):
+        for gauge in self.gauges:
+            gauge.end_live_resize()
+
+    def update_gauge(self, gauge, region=None):
+        # region is in gauge coordinates, None repaints the whole cell
+        region = QRegion(gauge.cell) if region is None else region.translated(gauge.cell.topLeft())
+        if self.collected_region is not None:
+            self.collected_region = self.collected_region.united(region)
+        else:
+            self.update(region)
+
+    def get_values(self):
+        return np.array([gauge.value for gauge in self.gauges], dtype=np.float64)
+
+    def set_values(self, values):
+        # one value per gauge, each taken like update_value() with its filter, trend and markers; the canvas
+        # schedules one repaint covering all changed needles and readouts
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) != len(self.gauges):
+            raise ValueError("got %d values for %d gauges" % (len(values), len(self.gauges)))
+        if not len(values):
+            return
+        before = self.get_values()
+        self.collected_region = QRegion()
+        try:
+            for gauge, value in zip(self.gauges, values.tolist()):
+                gauge.update_value(value)
+        finally:
+            dirty = self.collected_region
+            self.collected_region = None
+        if not dirty.isEmpty():
+            self.update(dirty)
+        if np.any(self.get_values() != before):
+            self.valuesChanged.emit()
+
+    def paintEvent(self, event):
+        region = event.region()
+        painter = QPainter(self)
+        try:
+            for gauge in self.gauges:
+                cell = gauge.cell
+                if cell.isEmpty() or not region.intersects(cell):
+                    continue
+                rect = region.intersected(cell).boundingRect().translated(-cell.x(), -cell.y())
+                painter.save()
+                painter.translate(cell.topLeft())
+                painter.setClipRect(rect)
+                gauge.paint_gauge(painter, rect)
+                painter.restore()
+        finally:
+            painter.end()
+
+
+if __name__ == "__main__":
+
+    def main():
+        import sys
+        from PySide6.QtCore import QTimer, QElapsedTimer
+
+        app = QApplication(sys.argv)
+        canvas = GaugeCanvas(count=16, columns=4)
+        canvas.resize(800, 800)
+        canvas.show()
+
+        phase = np.linspace(0, 2 * np.pi, len(canvas.gauges), endpoint=False)
+        elapsed = QElapsedTimer()
+        elapsed.start()
+        timer = QTimer()
+        timer.timeout.connect(lambda: canvas.set_values(500 + 450 * np.sin(phase + elapsed.elapsed() / 1000)))
+        timer.start(50)
+        sys.exit(app.exec())
+
+    main()
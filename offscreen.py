@@ -0,0 +1,149 @@
+###
+# Headless rendering of the widgets in this package into QImages.
+#
+# Widgets are never shown; they are painted with QWidget.render, so the images come from the same paint code as the
+# widgets on screen. Works on machines without a display through the offscreen QPA platform, which is selected
+# automatically on Linux when no display is available.
+#
+
+import math
+import os
+import sys
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtGui import QImage, QPainter, QRegion
+from PySide6.QtCore import Qt, QPoint, QSize
+from analoggaugewidget import AnalogGauge, AnalogGaugeWidget
+from QLed import QLed
+from SwitchControl import SwitchControl
+from switch_button import Switch
+
+IMAGE_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+WIDGET_TYPES = {
+    "gauge": AnalogGaugeWidget,
+    "led": QLed,
+    "switch_control": SwitchControl,
+    "switch": Switch,
+}
+
+application = None
+
+
+def ensure_application():
+    global application
+    app = QApplication.instance()
+    if app is None:
+        if sys.platform.startswith("linux") and not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = application = QApplication([])
+    return app
+
+
+def create_widget(kind, **kwargs):
+    ensure_application()
+    if kind not in WIDGET_TYPES:
+        raise ValueError("unknown widget %r, expected one of %s" % (kind, ", ".join(sorted(WIDGET_TYPES))))
+    return WIDGET_TYPES[kind](**kwargs)
+
+
+def apply_state(widget, state):
+    # a callable state configures the widget itself, anything else is the value the widget shows
+    if callable(state):
+        state(widget)
+    elif isinstance(widget, AnalogGauge):
+        widget.update_value(state)
+        if widget.needle_dynamics is not None:
+            # an image shows where the needle settles, not where an animation would be
+            widget.needle_value = widget.value
+            widget.needle_velocity = 0.0
+    elif isinstance(widget, QLed):
+        widget.setValue(bool(state))
+    elif isinstance(widget, SwitchControl):
+        widget.set_checked_immediately(bool(state))
+    elif isinstance(widget, Switch):
+        widget.setChecked(bool(state))
+    else:
+        raise TypeError("no default state for %s, pass a callable state" % type(widget).__name__)
+
+
+def to_size(size):
+    if isinstance(size, QSize):
+        return QSize(size)
+    width, height = size
+    return QSize(width, height)
+
+
+def render_widget(widget, size=None, dpr=1.0, background=Qt.transparent):
+    """Render the widget into a new QImage of size (logical pixels) at device pixel ratio dpr
+
+    background None paints the widget's window background like on screen. Widgets with a fixed size are scaled
+    to the requested size. Without a size, widgets that were never resized are rendered at their size hint.
+    """
+    ensure_application()
+    if size is None:
+        size = widget.size()
+        if not widget.testAttribute(Qt.WA_Resized) and widget.sizeHint().isValid():
+            size = widget.sizeHint()
+    else:
+        size = to_size(size)
+    if widget.size() != size:
+        widget.resize(size)
+        if isinstance(widget, AnalogGauge):
+            widget.rescale_method()
+
+    image = QImage(math.ceil(size.width() * dpr), math.ceil(size.height() * dpr), IMAGE_FORMAT)
+    image.setDevicePixelRatio(dpr)
+    image.fill(Qt.transparent if background is None else background)
+    flags = QWidget.DrawChildren
+    if background is None:
+        flags |= QWidget.DrawWindowBackground
+
+    if widget.size() == size:
+        widget.render(image, QPoint(), QRegion(), flags)
+    elif not widget.size().isEmpty():
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.scale(size.width() / widget.width(), size.height() / widget.height())
+        widget.render(painter, QPoint(), QRegion(), flags)
+        painter.end()
+    return image
+
+
+def iter_render_states(widget, states, size=None, dpr=1.0, background=Qt.transparent, apply=apply_state):
+    # one widget renders every state, so caches such as the gauge dial are built once
+    for state in states:
+        apply(widget, state)
+        yield render_widget(widget, size, dpr, background)
+
+
+def render_states(widget, states, size=None, dpr=1.0, background=Qt.transparent, apply=apply_state):
+    return list(iter_render_states(widget, states, size, dpr, background, apply))
+
+
+def render_images(kind, states, size=None, dpr=1.0, background=Qt.transparent, **kwargs):
+    """Render each state of a new widget of the given kind ("gauge", "led", "switch_control" or "switch")"""
+    widget = create_widget(kind, **kwargs)
+    try:
+        return render_states(widget, states, size, dpr, background)
+    finally:
+        widget.deleteLater()
+
+
+if __name__ == "__main__":
+
+    def main():
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Render widget states to PNG files without a display")
+        parser.add_argument("kind", choices=sorted(WIDGET_TYPES))
+        parser.add_argument("states", nargs="+", type=float)
+        parser.add_argument("--size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"))
+        parser.add_argument("--dpr", type=float, default=1.0)
+        parser.add_argument("--prefix", default="frame")
+        args = parser.parse_args()
+
+        states = args.states if args.kind == "gauge" else [bool(state) for state in args.states]
+        for index, image in enumerate(render_images(args.kind, states, args.size, args.dpr)):
+            image.save("%s_%04d.png" % (args.prefix, index))
+
+    main()
@@ -0,0 +1,177 @@
+###
+# Opt-in paint profiling of the widgets in this package.
+#
+# AnalogGaugeWidget (and GaugeModel) time every layer, the blit of the cached dial and the whole paint; QLed times
+# loading and rendering its SVG. Timings are kept per widget in rolling windows. Widgets without a profiler set
+# skip all of it, so profiling costs nothing while it is off.
+#
+# PaintHud draws the paint time and effective frame rate on top of any widget; widgets that are not instrumented
+# are timed as a whole through an event filter.
+#
+
+import time
+import weakref
+from collections import deque
+import numpy as np
+import shiboken6
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor, QFont, QFontMetrics
+from PySide6.QtCore import Qt, QObject, QEvent, QTimer, Signal
+
+PERCENTILES = (50, 90, 99)
+
+
+class PaintProfiler(QObject):
+    """Rolling per widget, per stage paint timings"""
+
+    # widget, duration of the whole paint in milliseconds
+    paintMeasured = Signal(object, float)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None or not shiboken6.isValid(cls._instance):
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, window=240, parent=None):
+        super(PaintProfiler, self).__init__(parent)
+        if window < 1:
+            raise ValueError("window must be at least 1, got %r" % window)
+        self.window = window
+        # widget -> {stage: deque of nanoseconds}, plus the end times of the paints under None
+        self.records = weakref.WeakKeyDictionary()
+
+    def attach(self, widget):
+        # True when the widget times its own stages
+        if hasattr(widget, "set_paint_profiler"):
+            widget.set_paint_profiler(self)
+        elif hasattr(widget, "setPaintProfiler"):
+            widget.setPaintProfiler(self)
+        else:
+            return False
+        return True
+
+    def detach(self, widget):
+        if hasattr(widget, "set_paint_profiler"):
+            widget.set_paint_profiler(None)
+        elif hasattr(widget, "setPaintProfiler"):
+            widget.setPaintProfiler(None)
+
+    def get_record(self, widget):
+        record = self.records.get(widget)
+        if record is None:
+            record = self.records[widget] = {None: deque(maxlen=self.window)}
+        return record
+
+    def record(self, widget, stage, nanoseconds):
+        record = self.get_record(widget)
+        samples = record.get(stage)
+        if samples is None:
+            samples = record[stage] = deque(maxlen=self.window)
+        samples.append(nanoseconds)
+
+    def record_paint(self, widget, nanoseconds):
+        self.record(widget, "paint", nanoseconds)
+        self.get_record(widget)[None].append(time.perf_counter_ns())
+        self.paintMeasured.emit(widget, nanoseconds / 1e6)
+
+    def get_widgets(self):
+        return list(self.records.keys())
+
+    def get_stats(self, widget):
+        """{stage: {"count", "mean", "max", "p50", "p90", "p99"}} in milliseconds over the rolling window"""
+        record = self.records.get(widget)
+        if record is None:
+            return {}
+        stats = {}
+        for stage, samples in record.items():
+            if stage is None or not samples:
+                continue
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples)) / 1e6
+            entry = {"count": len(values), "mean": float(values.mean()), "max": float(values.max())}
+            for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                entry["p%d" % percentile] = float(value)
+            stats[stage] = entry
+        return stats
+
+    def get_fps(self, widget, period=1.0):
+        # paints during the last period seconds
+        record = self.records.get(widget)
+        if record is None:
+            return 0.0
+        since = time.perf_counter_ns() - int(period * 1e9)
+        return sum(1 for end in record[None] if end >= since) / period
+
+    def reset(self, widget=None):
+        if widget is None:
+            self.records.clear()
+        else:
+            self.records.pop(widget, None)
+
+
+class PaintHud(QWidget):
+    """Overlay showing the paint time and effective frame rate of the widget it is placed on"""
+
+    def __init__(self, target, profiler=None, refresh_interval=250):
+        super(PaintHud, self).__init__(target)
+        self.target = target
+        self.profiler = profiler if profiler is not None else PaintProfiler.instance()
+        self.text = ""
+        self.measuring = False
+        # opaque, so refreshing the overlay does not repaint the widget below it
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hud_font = QFont("Monospace", 8)
+        self.hud_font.setStyleHint(QFont.TypeWriter)
+        metrics = QFontMetrics(self.hud_font)
+        self.setFixedSize(metrics.horizontalAdvance("paint 000.00 ms  p90 000.00  000 fps") + 8, metrics.height() + 4)
+        self.move(2, 2)
+
+        self.instrumented = self.profiler.attach(target)
+        target.installEventFilter(self)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(refresh_interval)
+        self.raise_()
+        self.show()
+
+    def eventFilter(self, watched, event):
+        if watched is not self.target or event.type() != QEvent.Paint or self.instrumented or self.measuring:
+            return False
+        # widgets that do not time themselves are timed around their whole paint event
+        self.measuring = True
+        started = time.perf_counter_ns()
+        try:
+            watched.event(event)
+        finally:
+            self.measuring = False
+        self.profiler.record_paint(watched, time.perf_counter_ns() - started)
+        return True
+
+    def refresh(self):
+        paint = self.profiler.get_stats(self.target).get("paint")
+        fps = self.profiler.get_fps(self.target)
+        if paint is None:
+            text = "paint -  %3d fps" % fps
+        else:
+            text = "paint %.2f ms  p90 %.2f  %3d fps" % (paint["p50"], paint["p90"], fps)
+        if text != self.text:
+            self.text = text
+            self.update()
+
+    def remove(self):
+        self.timer.stop()
+        self.target.removeEventFilter(self)
+        if self.instrumented:
+            self.profiler.detach(self.target)
+        self.deleteLater()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 255))
+        painter.setPen(QColor(0, 255, 0))
+        painter.setFont(self.hud_font)
+        painter.drawText(self.rect(), Qt.AlignCenter, self.text)
@@ -0,0 +1,335 @@
+###
+# Qt Quick counterpart of AnalogGaugeWidget.
+#
+# QuickAnalogGauge keeps the dial in scene graph texture nodes that are only replaced when the configuration or the
+# size changes. A value change sets the rotation of the needle's transform node and re-renders the small texture of
+# the readout, and of the trend and markers when their samples changed; the dial is not redrawn. All drawing is done by AnalogGauge, so the
+# configuration API and the look are those of the widget.
+#
+# Works with the software scene graph backend, for machines without a GPU: call use_software_backend() before the
+# first window is created, or set QT_QUICK_BACKEND=software.
+#
+
+import math
+from PySide6.QtGui import QGuiApplication, QImage, QPainter, QMatrix4x4, QPolygonF, QRegion
+from PySide6.QtQuick import (
+    QQuickItem,
+    QQuickWindow,
+    QSGNode,
+    QSGSimpleTextureNode,
+    QSGTransformNode,
+    QSGRendererInterface,
+    QSGTexture,
+)
+from PySide6.QtQml import qmlRegisterType
+from PySide6.QtCore import Qt, QSize, QRectF, Signal, Property
+from analoggaugewidget import AnalogGauge
+
+IMAGE_FORMAT = QImage.Format_ARGB32_Premultiplied
+# room around the needle texture for its antialiased edge
+NEEDLE_PADDING = 2
+
+
+def use_software_backend():
+    QQuickWindow.setGraphicsApi(QSGRendererInterface.Software)
+
+
+def register_qml_type(uri="Gauges", major=1, minor=0):
+    # import Gauges 1.0 / AnalogGauge { value: 500 }
+    return qmlRegisterType(QuickAnalogGauge, uri, major, minor, "AnalogGauge")
+
+
+class QuickGaugeModel(AnalogGauge):
+    """AnalogGauge state of a QuickAnalogGauge, sized by the item"""
+
+    def __init__(self, item):
+        self.item = item
+        self.init_gauge()
+
+    def width(self):
+        return max(int(round(self.item.width())), 0)
+
+    def height(self):
+        return max(int(round(self.item.height())), 0)
+
+    def size(self):
+        return QSize(self.width(), self.height())
+
+    def devicePixelRatioF(self):
+        window = self.item.window()
+        if window is None:
+            return 1.0
+        return window.effectiveDevicePixelRatio()
+
+    def update(self, region=None):
+        # whatever changed, the next polish works out which textures are stale
+        self.item.polish()
+        self.item.update()
+
+    def emit_value_changed(self, value):
+        self.item.valueChanged.emit(value)
+
+
+class NodeContent(object):
+    """What one child node of the gauge shows; a texture is only uploaded again when key changes
+
+    rect is in item coordinates, or relative to matrix when the node is transformed.
+    """
+
+    def __init__(self, name, key, image, rect, matrix=None):
+        self.name = name
+        self.key = key
+        self.image = image
+        self.rect = rect
+        self.matrix = matrix
+
+
+class QuickAnalogGauge(QQuickItem):
+    """Analog gauge drawn by the Qt Quick scene graph; configure it through its AnalogGauge, gauge"""
+
+    valueChanged = Signal(int)
+
+    def __init__(self, parent=None):
+        super(QuickAnalogGauge, self).__init__(parent)
+        self.setFlag(QQuickItem.ItemHasContents, True)
+        # filled on the GUI thread by updatePolish(), turned into nodes on the render thread
+        self.contents = []
+        # the root node is created in Python and must stay referenced for as long as the scene graph uses it;
+        # [outer node, texture node, key of its texture] per content, and the layout they were built for
+        self.root_node = None
+        self.nodes = []
+        self.node_structure = None
+        self.gauge = QuickGaugeModel(self)
+
+    def get_value(self):
+        return self.gauge.value
+
+    def set_value(self, value):
+        self.gauge.update_value(value)
+
+    value = Property(float, get_value, set_value, notify=valueChanged)
+
+    def update_value(self, value):
+        self.gauge.update_value(value)
+
+    def geometryChange(self, new_geometry, old_geometry):
+        super(QuickAnalogGauge, self).geometryChange(new_geometry, old_geometry)
+        if new_geometry.size() != old_geometry.size():
+            self.gauge.rescale_method()
+            self.polish()
+            self.update()
+
+    def get_content(self, previous, name, key, render, rect, matrix=None):
+        content = previous.get(name)
+        if content is not None and content.key == key:
+            return NodeContent(name, key, content.image, rect, matrix)
+        return NodeContent(name, key, render(), rect, matrix)
+
+    def create_image(self, rect, dpr):
+        image = QImage(QSize(math.ceil(rect.width() * dpr), math.ceil(rect.height() * dpr)), IMAGE_FORMAT)
+        image.setDevicePixelRatio(dpr)
+        image.fill(Qt.transparent)
+        return image
+
+    def render_layer(self, layer, rect, dpr):
+        image = self.create_image(rect, dpr)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(self.gauge.width() / 2 - rect.x(), self.gauge.height() / 2 - rect.y())
+        layer.paint(painter)
+        painter.end()
+        return image
+
+    def get_needle_rect(self):
+        # the unrotated needle in gauge coordinates
+        rect = QPolygonF(self.gauge.value_needle[0]).boundingRect()
+        return rect.adjusted(-NEEDLE_PADDING, -NEEDLE_PADDING, NEEDLE_PADDING, NEEDLE_PADDING)
+
+    def render_needle(self, rect, dpr):
+        image = self.create_image(rect, dpr)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-rect.x(), -rect.y())
+        self.gauge.draw_needle_polygon(painter)
+        painter.end()
+        return image
+
+    def get_needle_matrix(self):
+        matrix = QMatrix4x4()
+        matrix.translate(self.gauge.width() / 2, self.gauge.height() / 2)
+        matrix.rotate(self.gauge.get_needle_angle(self.gauge.get_needle_value()), 0, 0, 1)
+        return matrix
+
+    def get_dynamic_key(self, layer, rect, dpr):
+        # each layer is re-rendered when what it draws changes; only the readout and layers unknown here follow the
+        # value, the scale mapping of the needles, markers and trend is in the dial cache key
+        gauge = self.gauge
+        key = (layer.name, rect.getRect(), dpr)
+        if layer.name == "value_text" and layer.paint == gauge.create_values_text:
+            return key + (
+                gauge.get_value_text(),
+                gauge.value_fontname,
+                gauge.value_fontsize,
+                gauge.DisplayValueColor.rgba(),
+            )
+        if layer.name == "center_point":
+            return key + (gauge.widget_diameter, gauge.CenterPointColor.rgba())
+        if layer.name == "needles" and layer.paint == gauge.draw_needles:
+            return key + (
+                gauge.get_dial_cache_key(dpr),
+                gauge.get_needles_key(),
+                tuple((point.x(), point.y()) for point in gauge.value_needle[0]),
+            )
+        if layer.name == "value_markers" and layer.paint == gauge.draw_value_markers:
+            return key + (gauge.get_dial_cache_key(dpr), gauge.get_markers_key())
+        if layer.name == "trend" and layer.paint == gauge.draw_trend:
+            return key + (
+                gauge.get_dial_cache_key(dpr),
+                gauge.trend.version,
+                gauge.TrendColor.rgba(),
+                gauge.trend_rect_factors,
+            )
+        return key + (
+            gauge.get_dial_cache_key(dpr),
+            gauge.value,
+            gauge.get_needle_value(),
+            gauge.NeedleColor.rgba(),
+            gauge.DisplayValueColor.rgba(),
+            gauge.CenterPointColor.rgba(),
+            gauge.get_needles_key(),
+            gauge.get_markers_key(),
+        )
+
+    def updatePolish(self):
+        # GUI thread: render what changed into images, the render thread only uploads them
+        gauge = self.gauge
+        if gauge.width() <= 0 or gauge.height() <= 0:
+            self.contents = []
+            return
+        dpr = gauge.devicePixelRatioF()
+        previous = {content.name: content for content in self.contents}
+        full_rect = QRectF(0, 0, gauge.width(), gauge.height())
+        contents = []
+        used_runs = set()
+
+        def add_static_run(layers):
+            names = tuple(layer.name for layer in layers)
+            used_runs.add(names)
+            key = gauge.get_dial_cache_key(dpr) + names
+            contents.append(
+                self.get_content(previous, names, key, lambda: gauge.get_dial_pixmap(layers, dpr).toImage(), full_rect)
+            )
+
+        # consecutive static layers share one texture, like the cached dial pixmaps of the widget
+        static_run = []
+        for layer in gauge.layers:
+            if not layer.is_active():
+                continue
+            if layer.is_static():
+                static_run.append(layer)
+                continue
+            if static_run:
+                add_static_run(static_run)
+                static_run = []
+            if layer.name == "needle" and layer.paint == gauge.draw_needle:
+                rect = self.get_needle_rect()
+                key = (tuple((point.x(), point.y()) for point in gauge.value_needle[0]), gauge.NeedleColor.rgba(), dpr)
+                contents.append(
+                    self.get_content(
+                        previous, layer.name, key, lambda: self.render_needle(rect, dpr), rect, self.get_needle_matrix()
+                    )
+                )
+                continue
+            bounds = layer.bounds() if layer.bounds is not None else full_rect
+            rect = QRectF(bounds.boundingRect() if isinstance(bounds, QRegion) else bounds)
+            rect = rect.intersected(full_rect)
+            if rect.isEmpty():
+                continue
+            contents.append(
+                self.get_content(
+                    previous,
+                    layer.name,
+                    self.get_dynamic_key(layer, rect, dpr),
+                    lambda: self.render_layer(layer, rect, dpr),
+                    rect,
+                )
+            )
+        if static_run:
+            add_static_run(static_run)
+
+        for names in [names for names in gauge.dial_cache if names not in used_runs]:
+            del gauge.dial_cache[names]
+        self.contents = contents
+
+    def updatePaintNode(self, node, data):
+        # render thread, while the GUI thread is blocked
+        contents = self.contents
+        if not contents:
+            self.root_node = None
+            self.nodes = []
+            self.node_structure = None
+            return None
+
+        structure = tuple((content.name, content.matrix is not None) for content in contents)
+        rebuild = node is None or structure != self.node_structure
+        if rebuild:
+            if node is None:
+                node = self.root_node = QSGNode()
+            else:
+                node.removeAllChildNodes()
+            self.nodes = [self.create_node(content) for content in contents]
+            self.node_structure = structure
+
+        window = self.window()
+        for entry, content in zip(self.nodes, contents):
+            outer, texture_node, key = entry
+            if key != content.key:
+                texture_node.setTexture(window.createTextureFromImage(content.image))
+                entry[2] = content.key
+            texture_node.setRect(content.rect)
+            if content.matrix is not None:
+                outer.setMatrix(content.matrix)
+
+        # the software renderer reads the texture of a node as soon as it is added to the scene
+        if rebuild:
+            for outer, texture_node, key in self.nodes:
+                node.appendChildNode(outer)
+        return node
+
+    def create_node(self, content):
+        texture_node = QSGSimpleTextureNode()
+        texture_node.setOwnsTexture(True)
+        texture_node.setFiltering(QSGTexture.Linear)
+        outer = texture_node
+        if content.matrix is not None:
+            outer = QSGTransformNode()
+            # deleted through its own wrapper, the transform node must not delete it as well
+            texture_node.setFlag(QSGNode.OwnedByParent, False)
+            outer.appendChildNode(texture_node)
+        return [outer, texture_node, None]
+
+
+if __name__ == "__main__":
+
+    def main():
+        import sys
+        from PySide6.QtCore import QTimer, QElapsedTimer
+
+        app = QGuiApplication(sys.argv)
+        window = QQuickWindow()
+        window.setColor(Qt.white)
+        window.resize(400, 400)
+        item = QuickAnalogGauge(window.contentItem())
+        item.setSize(window.size().toSizeF())
+        window.widthChanged.connect(lambda: item.setWidth(window.width()))
+        window.heightChanged.connect(lambda: item.setHeight(window.height()))
+        window.show()
+
+        elapsed = QElapsedTimer()
+        elapsed.start()
+        timer = QTimer()
+        timer.timeout.connect(lambda: item.update_value(500 + 450 * math.sin(elapsed.elapsed() / 1000)))
+        timer.start(16)
+        sys.exit(app.exec())
+
+    main()
@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QWidget, QLabel,
 )
+from frameclock import FrameClock
 
 
 class SwitchButton(QWidget):
@@ -203,6 +204,7 @@ class Switch(QAbstractButton):
             False: lambda: self._base_offset,
         }
         self._offset = self._base_offset
+        self._use_frame_clock = False
 
         palette = self.palette()
         if self._thumb_radius > self._track_radius:
@@ -249,7 +251,14 @@ class Switch(QAbstractButton):
     @offset.setter
     def offset(self, value):
         self._offset = value
-        self.update()
+        # animation steps are batched onto the shared FrameClock when enabled
+        if self._use_frame_clock:
+            FrameClock.instance().mark_dirty(self)
+        else:
+            self.update()
+
+    def setUseFrameClock(self, enable):
+        self._use_frame_clock = enable
 
     def sizeHint(self):  # pylint: disable=invalid-name
         return QSize(
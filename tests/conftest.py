@@ -0,0 +1,12 @@
+import os
+import pytest
+
+# no display needed, the gauge state only needs a QGuiApplication for fonts
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtGui import QGuiApplication
+
+    return QGuiApplication.instance() or QGuiApplication([])
@@ -0,0 +1,60 @@
+import pytest
+from PySide6.QtGui import QColor
+
+
+@pytest.fixture
+def gauge(qapp):
+    from gaugecanvas import GaugeModel
+
+    return GaugeModel()
+
+
+def get_state(gauge):
+    return (gauge.value_min, gauge.value_max, gauge.NeedleColor.rgba(), gauge.scala_main_count, gauge.scale_mapping)
+
+
+def test_returns_changed_settings(gauge):
+    assert gauge.configure(value_max=500, NeedleColor="red", enable_CenterPoint=False) == [
+        "value_max",
+        "NeedleColor",
+        "enable_CenterPoint",
+    ]
+    assert gauge.value_max == 500
+    assert gauge.NeedleColor == QColor("red")
+    assert gauge.enable_CenterPoint is False
+    assert gauge.configure(value_max=500, NeedleColor="red", enable_CenterPoint=False) == []
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"value_max": -5, "NeedleColor": "red"},
+        {"value_min": 1000, "NeedleColor": "red"},
+        {"value_min": 5, "value_max": 5, "NeedleColor": "red"},
+        {"NeedleColor": "red", "scale_mapping": "log"},
+        {"NeedleColor": "red", "scale_mapping": {"type": "piecewise", "points": [[2000, 0], [3000, 1]]}},
+        {"NeedleColor": "red", "ScaleValueColor": "not a color"},
+        {"NeedleColor": "red", "enable_bogus": True},
+    ],
+)
+def test_rejected_configuration_changes_nothing(gauge, settings):
+    before = get_state(gauge)
+    with pytest.raises(ValueError):
+        gauge.configure(**settings)
+    assert get_state(gauge) == before
+
+
+def test_range_and_mapping_are_checked_together(gauge):
+    assert gauge.configure(value_min=1, scale_mapping="log") == ["value_min", "scale_mapping"]
+    with pytest.raises(ValueError):
+        gauge.configure(value_min=0)
+    assert gauge.value_min == 1
+
+
+def test_clamped_settings_are_not_reported_again(gauge):
+    assert gauge.configure(scala_main_count=0, value=5000) == ["scala_main_count", "value"]
+    assert gauge.scala_main_count == 1
+    assert gauge.value == gauge.value_max
+    assert gauge.configure(scala_main_count=0, value=5000) == []
+    assert gauge.configure(scale_polygon_colors=None) == ["scale_polygon_colors"]
+    assert gauge.configure(scale_polygon_colors=None) == []
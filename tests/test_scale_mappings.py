@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from analoggaugewidget import LogScale, PiecewiseScale, ScaleMapping, SqrtScale, create_scale_mapping
+
+
+def test_linear_range_must_not_be_empty():
+    with pytest.raises(ValueError):
+        ScaleMapping().validate(10, 10)
+    with pytest.raises(ValueError):
+        ScaleMapping().compile(10, 0)
+
+
+@pytest.mark.parametrize("mapping, value_min, value_max", [(LogScale(), 1e-3, 1e3), (SqrtScale(), 0, 100)])
+def test_table_spans_the_arc(mapping, value_min, value_max):
+    table = mapping.compile(value_min, value_max)
+    assert table.get_fraction(value_min) == pytest.approx(0)
+    assert table.get_fraction(value_max) == pytest.approx(1)
+    # values beyond the range stay at the ends of the arc
+    assert table.get_fraction(value_min - 1) == 0
+    assert table.get_fraction(value_max * 2) == 1
+    assert table.to_value(np.array([0.0, 1.0])) == pytest.approx([value_min, value_max])
+
+
+def test_log_scale_is_even_per_decade():
+    table = LogScale().compile(1, 1000)
+    assert table.to_fraction(np.array([10.0, 100.0])) == pytest.approx([1 / 3, 2 / 3], abs=1e-4)
+    assert table.get_fraction(100.0) == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_log_scale_needs_positive_minimum():
+    with pytest.raises(ValueError):
+        LogScale().validate(0, 100)
+
+
+def test_sqrt_scale_spreads_out_the_low_end():
+    table = SqrtScale().compile(0, 100)
+    assert table.get_fraction(25.0) == pytest.approx(0.5, abs=1e-4)
+    assert table.get_slope(1.0) > table.get_slope(90.0)
+
+
+def test_piecewise_scale_interpolates_between_points():
+    table = PiecewiseScale([(0, 0), (100, 0.5), (1000, 1)]).compile(0, 1000)
+    assert table.get_fraction(50.0) == pytest.approx(0.25)
+    assert table.get_fraction(550.0) == pytest.approx(0.75)
+    assert table.get_fraction(1000.0) == pytest.approx(1)
+
+
+def test_piecewise_scale_rescales_to_a_partial_range():
+    # the range ends between the points are the ends of the arc
+    table = PiecewiseScale([(0, 0), (100, 0.5), (1000, 1)]).compile(50, 550)
+    assert table.get_fraction(50.0) == pytest.approx(0)
+    assert table.get_fraction(100.0) == pytest.approx(0.5)
+    assert table.get_fraction(550.0) == pytest.approx(1)
+
+
+@pytest.mark.parametrize("value_min, value_max", [(1000, 2000), (-50, 0), (2000, 3000)])
+def test_piecewise_scale_must_overlap_the_range(value_min, value_max):
+    mapping = PiecewiseScale([(0, 0), (1000, 1)])
+    with pytest.raises(ValueError):
+        mapping.validate(value_min, value_max)
+    with pytest.raises(ValueError):
+        mapping.compile(value_min, value_max)
+
+
+@pytest.mark.parametrize("points", [[(0, 0)], [(0, 0), (0, 1)], [(0, 0.5), (10, 0.2)]])
+def test_piecewise_scale_rejects_bad_points(points):
+    with pytest.raises(ValueError):
+        PiecewiseScale(points)
+
+
+def test_create_scale_mapping():
+    assert create_scale_mapping(None) is None
+    assert create_scale_mapping("linear") is None
+    assert create_scale_mapping("log") == LogScale()
+    assert create_scale_mapping({"type": "piecewise", "points": [[0, 0], [10, 1]]}) == PiecewiseScale([(0, 0), (10, 1)])
+    with pytest.raises(ValueError):
+        create_scale_mapping("cubic")
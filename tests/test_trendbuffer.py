@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from trendbuffer import TrendBuffer
+
+
+def test_ring_keeps_the_newest_samples_in_order():
+    trend = TrendBuffer(capacity=5, span=100, columns=10)
+    for index in range(8):
+        trend.append(float(index), float(index))
+    times, values = trend.get_samples()
+    assert len(trend) == 5
+    assert times.tolist() == [3, 4, 5, 6, 7]
+    assert values.tolist() == [3, 4, 5, 6, 7]
+
+
+def test_extend_wraps_like_append():
+    appended = TrendBuffer(capacity=7, span=100, columns=10)
+    extended = TrendBuffer(capacity=7, span=100, columns=10)
+    for index in range(5):
+        appended.append(float(index), float(index))
+    extended.extend(np.arange(5.0), np.arange(5.0))
+    for index in range(5, 23):
+        appended.append(float(index), float(index))
+    extended.extend(np.arange(5.0, 23.0), np.arange(5.0, 23.0))
+    for left, right in zip(appended.get_samples(), extended.get_samples()):
+        assert left.tolist() == right.tolist()
+    for left, right in zip(appended.get_columns(), extended.get_columns()):
+        np.testing.assert_array_equal(left, right)
+
+
+def test_extend_longer_than_the_capacity():
+    trend = TrendBuffer(capacity=4, span=100, columns=10)
+    trend.append(-1.0, 0.0)
+    trend.extend(np.arange(10.0), np.arange(1.0, 11.0))
+    assert trend.get_samples()[1].tolist() == [6, 7, 8, 9]
+
+
+def test_columns_hold_min_and_max():
+    trend = TrendBuffer(span=10, columns=5)
+    trend.extend([3.0, 1.0, 2.0, 8.0], [0.5, 1.0, 1.5, 4.5])
+    mins, maxs = trend.get_columns()
+    # two seconds per column: t 0 to 2, the empty one of t 2 to 4 and the newest of t 4 to 6
+    np.testing.assert_array_equal(mins[-3:], [1.0, np.nan, 8.0])
+    np.testing.assert_array_equal(maxs[-3:], [3.0, np.nan, 8.0])
+    assert np.isnan(mins[:2]).all()
+
+
+def test_old_columns_scroll_out():
+    trend = TrendBuffer(span=10, columns=5)
+    trend.append(5.0, 0.0)
+    trend.append(6.0, 8.5)
+    mins, maxs = trend.get_columns()
+    assert mins[0] == 5.0 and mins[-1] == 6.0
+    trend.append(7.0, 10.5)
+    mins, maxs = trend.get_columns()
+    assert np.nanmin(mins) == 6.0
+    # a gap longer than the span empties every column
+    trend.append(1.0, 100.0)
+    mins, maxs = trend.get_columns()
+    assert np.count_nonzero(~np.isnan(mins)) == 1
+
+
+def test_rebuilt_columns_match_incremental_ones():
+    values = np.random.default_rng(1).normal(size=200)
+    times = np.linspace(0, 20, 200)
+    trend = TrendBuffer(span=10, columns=20)
+    trend.extend(values, times)
+    trend.set_columns(40)
+    fresh = TrendBuffer(span=10, columns=40)
+    fresh.extend(values, times)
+    for left, right in zip(trend.get_columns(), fresh.get_columns()):
+        np.testing.assert_array_equal(left, right)
+
+
+def test_non_finite_samples_are_skipped():
+    trend = TrendBuffer(capacity=4)
+    trend.append(float("nan"), 0.0)
+    trend.extend([1.0, float("inf"), 2.0], 1.0)
+    assert trend.get_samples()[1].tolist() == [1.0, 2.0]
+
+
+def test_version_changes_with_every_change():
+    trend = TrendBuffer()
+    versions = [trend.version]
+    trend.append(1.0, 0.0)
+    versions.append(trend.version)
+    trend.clear()
+    versions.append(trend.version)
+    assert versions == sorted(set(versions))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TrendBuffer(capacity=0)
+    with pytest.raises(ValueError):
+        TrendBuffer(span=0)
+    with pytest.raises(ValueError):
+        TrendBuffer().set_span(-1)
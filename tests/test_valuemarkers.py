@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from valuemarkers import RollingExtreme, ValueExtremes
+
+
+def test_rolling_max_expires_after_the_window():
+    rolling = RollingExtreme(1.0)
+    rolling.add(5.0, 0.0)
+    rolling.add(3.0, 0.5)
+    assert rolling.get() == 5.0
+    assert rolling.get_expiry() == 1.0
+    rolling.expire(1.0)
+    assert rolling.get() == 3.0
+    # the newest sample stays however old it gets
+    rolling.expire(100.0)
+    assert rolling.get() == 3.0
+    assert rolling.get_expiry() is None
+
+
+def test_rolling_min():
+    rolling = RollingExtreme(2.0, sign=-1)
+    for timestamp, value in enumerate([4.0, 2.0, 6.0, 5.0]):
+        rolling.add(value, float(timestamp))
+    # t 2 and 3 are left in the window ending at 3
+    assert rolling.get() == 5.0
+
+
+def test_rolling_extend_matches_add():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=300)
+    times = np.cumsum(rng.uniform(0.01, 0.1, 300))
+    for sign in (1, -1):
+        added = RollingExtreme(1.5, sign)
+        extended = RollingExtreme(1.5, sign)
+        for start in range(0, 300, 37):
+            chunk = slice(start, start + 37)
+            for value, timestamp in zip(values[chunk], times[chunk]):
+                added.add(float(value), float(timestamp))
+            extended.extend(values[chunk], times[chunk])
+            assert extended.get() == added.get()
+
+
+def test_window_must_be_positive():
+    with pytest.raises(ValueError):
+        RollingExtreme(0)
+
+
+def test_session_and_window_markers():
+    extremes = ValueExtremes(window=1.0)
+    assert extremes.get_markers(0.0) == {}
+    extremes.add(5.0, 0.0)
+    extremes.extend(np.array([9.0, 1.0, 4.0]), np.array([0.2, 0.4, 1.3]))
+    # 9 at t 0.2 left the window ending at 1.3
+    assert extremes.get_markers(1.3) == {
+        "session_min": 1.0,
+        "session_max": 9.0,
+        "rolling_min": 1.0,
+        "rolling_max": 4.0,
+    }
+    markers = extremes.get_markers(2.3)
+    assert markers["rolling_min"] == 4.0 and markers["rolling_max"] == 4.0
+    assert markers["session_max"] == 9.0
+
+
+def test_peak_holds_then_decays():
+    extremes = ValueExtremes(session=False, peak_hold=1.0, peak_decay=10.0)
+    extremes.add(100.0, 0.0)
+    extremes.add(50.0, 0.5)
+    assert extremes.get_markers(0.9) == {"peak": 100.0}
+    assert extremes.get_next_change(0.9) == 1.0
+    assert extremes.get_markers(2.0)["peak"] == pytest.approx(90.0)
+    assert extremes.get_next_change(2.0) == 2.0
+    # never below the current value, and settled once it got there
+    assert extremes.get_markers(100.0)["peak"] == 50.0
+    assert extremes.get_next_change(100.0) is None
+
+
+def test_peak_without_decay_drops_at_once():
+    extremes = ValueExtremes(session=False, peak_hold=1.0)
+    extremes.add(100.0, 0.0)
+    extremes.add(20.0, 0.1)
+    assert extremes.get_markers(1.0)["peak"] == 100.0
+    assert extremes.get_markers(1.01)["peak"] == 20.0
+
+
+def test_higher_value_takes_over_the_peak():
+    extremes = ValueExtremes(session=False, peak_hold=1.0, peak_decay=10.0)
+    extremes.add(100.0, 0.0)
+    extremes.add(95.0, 2.0)
+    extremes.add(60.0, 2.5)
+    assert extremes.get_markers(2.5)["peak"] == 95.0
+    assert extremes.get_next_change(2.5) == 3.0
+
+
+def test_next_change_is_the_window_expiry():
+    extremes = ValueExtremes(window=2.0)
+    extremes.add(3.0, 0.0)
+    extremes.add(1.0, 0.5)
+    assert extremes.get_next_change(0.5) == 2.0
+
+
+def test_reset():
+    extremes = ValueExtremes(window=1.0, peak_hold=1.0)
+    extremes.add(3.0, 0.0)
+    extremes.reset()
+    assert extremes.get_markers(0.0) == {}
+    extremes.add(1.0, 0.1)
+    assert extremes.get_markers(0.1)["session_max"] == 1.0
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ValueExtremes(peak_hold=-1)
+    with pytest.raises(ValueError):
+        ValueExtremes(peak_hold=1, peak_decay=0)
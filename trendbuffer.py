@@ -0,0 +1,152 @@
+###
+# Fixed size history of a signal, decimated to one min/max pair per pixel column.
+#
+# Samples are kept in a preallocated ring buffer, so memory stays the same however long a gauge runs. Every sample
+# also updates the min/max of the column its time falls into, and drawing only reads the columns: the cost of a
+# frame depends on the number of columns, not on the number of samples. The raw samples are only read again when
+# the number of columns or the span changes.
+#
+
+import math
+import numpy as np
+
+
+class TrendBuffer(object):
+    """Ring buffer of (time, value) samples with the min/max per column over the last span seconds
+
+    The window ends at the newest sample, so any time base works as long as it is used consistently.
+    """
+
+    def __init__(self, capacity=4096, span=60.0, columns=100):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1, got %r" % capacity)
+        if span <= 0:
+            raise ValueError("span must be positive, got %r" % span)
+        self.capacity = capacity
+        self.span = float(span)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        # next write position and number of valid samples
+        self.end = 0
+        self.count = 0
+        # increased by every change, for callers caching what they drew
+        self.version = 0
+        self.columns = 0
+        self.set_columns(columns)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.end = 0
+        self.count = 0
+        self.reset_columns()
+
+    def set_columns(self, columns):
+        columns = max(int(columns), 1)
+        if columns != self.columns:
+            self.columns = columns
+            self.rebuild_columns()
+
+    def set_span(self, span):
+        if span <= 0:
+            raise ValueError("span must be positive, got %r" % span)
+        if span != self.span:
+            self.span = float(span)
+            self.rebuild_columns()
+
+    def reset_columns(self):
+        self.column_duration = self.span / self.columns
+        self.mins = np.full(self.columns, np.nan)
+        self.maxs = np.full(self.columns, np.nan)
+        # absolute index (time // column_duration) of the newest column
+        self.newest_column = None
+        self.version += 1
+
+    def rebuild_columns(self):
+        self.reset_columns()
+        if self.count:
+            self.add_to_columns(*self.get_samples())
+
+    def get_samples(self):
+        # (timestamps, values), oldest first
+        if self.count < self.capacity:
+            return self.times[: self.count].copy(), self.values[: self.count].copy()
+        return (
+            np.concatenate((self.times[self.end :], self.times[: self.end])),
+            np.concatenate((self.values[self.end :], self.values[: self.end])),
+        )
+
+    def append(self, value, timestamp):
+        if not math.isfinite(value):
+            return
+        self.times[self.end] = timestamp
+        self.values[self.end] = value
+        self.end = (self.end + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        column = math.floor(timestamp / self.column_duration)
+        self.advance(column)
+        if column > self.newest_column - self.columns:
+            index = column % self.columns
+            if not self.mins[index] <= value:
+                self.mins[index] = value
+            if not self.maxs[index] >= value:
+                self.maxs[index] = value
+        self.version += 1
+
+    def extend(self, values, timestamps):
+        # timestamps may be a single time for all values
+        values = np.asarray(values, dtype=np.float64).ravel()
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.float64), values.shape)
+        finite = np.isfinite(values)
+        if not finite.all():
+            values = values[finite]
+            timestamps = timestamps[finite]
+        if not len(values):
+            return
+
+        # only the newest capacity samples stay in the ring
+        stored = min(len(values), self.capacity)
+        positions = (self.end + np.arange(stored)) % self.capacity
+        self.times[positions] = timestamps[-stored:]
+        self.values[positions] = values[-stored:]
+        self.end = (self.end + stored) % self.capacity
+        self.count = min(self.count + stored, self.capacity)
+
+        self.add_to_columns(timestamps, values)
+        self.version += 1
+
+    def add_to_columns(self, timestamps, values):
+        columns = np.floor(timestamps / self.column_duration).astype(np.int64)
+        self.advance(int(columns.max()))
+        inside = columns > self.newest_column - self.columns
+        indices = columns[inside] % self.columns
+        np.fmin.at(self.mins, indices, values[inside])
+        np.fmax.at(self.maxs, indices, values[inside])
+
+    def advance(self, column):
+        # make column the newest one, emptying the columns that scroll in
+        if self.newest_column is None:
+            self.newest_column = column
+            return
+        if column <= self.newest_column:
+            return
+        if column - self.newest_column >= self.columns:
+            self.mins.fill(np.nan)
+            self.maxs.fill(np.nan)
+        else:
+            cleared = np.arange(self.newest_column + 1, column + 1) % self.columns
+            self.mins[cleared] = np.nan
+            self.maxs[cleared] = np.nan
+        self.newest_column = column
+
+    def get_columns(self):
+        """(mins, maxs) per column, oldest first; NaN where a column has no samples"""
+        if self.newest_column is None:
+            return self.mins.copy(), self.maxs.copy()
+        start = (self.newest_column + 1) % self.columns
+        return (
+            np.concatenate((self.mins[start:], self.mins[:start])),
+            np.concatenate((self.maxs[start:], self.maxs[:start])),
+        )
@@ -0,0 +1,169 @@
+###
+# Session, rolling window and peak hold extremes of a signal, updated incrementally.
+#
+# The rolling min/max use monotonic deques: every sample is appended once and dropped at most once, so an update
+# costs O(1) amortized however long the window is. A chunk of samples is first reduced with NumPy to the samples
+# that can still become the extreme of the window (those beyond every later sample of the chunk).
+#
+# The peak hold keeps the highest value for peak_hold seconds and then lets it fall at peak_decay value units per
+# second, or drops it to the current value right away without a decay; it never shows less than the current value.
+#
+
+from collections import deque
+import numpy as np
+
+
+class RollingExtreme(object):
+    """Max of the samples of the last window seconds, or the min with sign=-1"""
+
+    def __init__(self, window, sign=1):
+        if window <= 0:
+            raise ValueError("window must be positive, got %r" % window)
+        self.window = float(window)
+        self.sign = sign
+        # (timestamp, sign * value), falling from the front; the newest sample is always the last one
+        self.samples = deque()
+
+    def clear(self):
+        self.samples.clear()
+
+    def push(self, value, timestamp):
+        samples = self.samples
+        while samples and samples[-1][1] <= value:
+            samples.pop()
+        samples.append((timestamp, value))
+
+    def add(self, value, timestamp):
+        self.push(self.sign * value, timestamp)
+        self.expire(timestamp)
+
+    def extend(self, values, timestamps):
+        # values and timestamps are arrays in time order
+        values = self.sign * values
+        later = np.maximum.accumulate(values[::-1])[::-1]
+        candidates = np.empty(len(values), dtype=bool)
+        candidates[:-1] = values[:-1] > later[1:]
+        candidates[-1] = True
+        for timestamp, value in zip(timestamps[candidates].tolist(), values[candidates].tolist()):
+            self.push(value, timestamp)
+        self.expire(float(timestamps[-1]))
+
+    def expire(self, now):
+        samples = self.samples
+        while len(samples) > 1 and samples[0][0] <= now - self.window:
+            samples.popleft()
+
+    def get(self):
+        if not self.samples:
+            return None
+        return self.sign * self.samples[0][1]
+
+    def get_expiry(self):
+        # time the extreme changes without new samples, None when only the newest sample is left
+        if len(self.samples) < 2:
+            return None
+        return self.samples[0][0] + self.window
+
+
+class ValueExtremes(object):
+    """Session min/max, rolling window min/max and peak hold of one signal; window and peak_hold are in seconds"""
+
+    def __init__(self, session=True, window=None, peak_hold=None, peak_decay=None):
+        if peak_hold is not None and peak_hold < 0:
+            raise ValueError("peak_hold must not be negative, got %r" % peak_hold)
+        if peak_decay is not None and peak_decay <= 0:
+            raise ValueError("peak_decay must be positive, got %r" % peak_decay)
+        self.session = session
+        self.rolling_max = RollingExtreme(window, 1) if window is not None else None
+        self.rolling_min = RollingExtreme(window, -1) if window is not None else None
+        self.peak_hold = peak_hold
+        self.peak_decay = peak_decay
+        self.reset()
+
+    def reset(self):
+        self.session_min = None
+        self.session_max = None
+        self.last_value = None
+        # (value, timestamp) of the held peak
+        self.peak = None
+        if self.rolling_max is not None:
+            self.rolling_max.clear()
+            self.rolling_min.clear()
+
+    def add(self, value, timestamp):
+        if self.session_min is None or value < self.session_min:
+            self.session_min = value
+        if self.session_max is None or value > self.session_max:
+            self.session_max = value
+        if self.rolling_max is not None:
+            self.rolling_max.add(value, timestamp)
+            self.rolling_min.add(value, timestamp)
+        # the held peak is compared as it has decayed, not floored at the previous sample
+        self.last_value = value
+        self.update_peak(value, timestamp)
+
+    def extend(self, values, timestamps):
+        # values and timestamps are arrays in time order; the chunk's highest sample competes for the peak
+        if not len(values):
+            return
+        lowest = float(values.min())
+        highest = int(values.argmax())
+        if self.session_min is None or lowest < self.session_min:
+            self.session_min = lowest
+        if self.session_max is None or values[highest] > self.session_max:
+            self.session_max = float(values[highest])
+        if self.rolling_max is not None:
+            self.rolling_max.extend(values, timestamps)
+            self.rolling_min.extend(values, timestamps)
+        self.last_value = float(values[-1])
+        self.update_peak(float(values[highest]), float(timestamps[highest]))
+
+    def update_peak(self, value, timestamp):
+        if self.peak_hold is None:
+            return
+        if self.peak is None or value >= self.get_peak(timestamp):
+            self.peak = (value, timestamp)
+
+    def get_peak(self, now):
+        value, since = self.peak
+        released = now - since - self.peak_hold
+        if released > 0:
+            value = self.last_value if self.peak_decay is None else value - self.peak_decay * released
+        return max(value, self.last_value)
+
+    def expire(self, now):
+        if self.rolling_max is not None:
+            self.rolling_max.expire(now)
+            self.rolling_min.expire(now)
+
+    def get_markers(self, now):
+        """{name: value} of the tracked extremes at time now; names are session_min, session_max, rolling_min,
+        rolling_max and peak"""
+        markers = {}
+        if self.last_value is None:
+            return markers
+        if self.session:
+            markers["session_min"] = self.session_min
+            markers["session_max"] = self.session_max
+        if self.rolling_max is not None:
+            self.expire(now)
+            markers["rolling_min"] = self.rolling_min.get()
+            markers["rolling_max"] = self.rolling_max.get()
+        if self.peak is not None:
+            markers["peak"] = self.get_peak(now)
+        return markers
+
+    def get_next_change(self, now):
+        """Time the markers next change without new samples: now while the peak is falling, None when they never
+        change again"""
+        changes = []
+        if self.peak is not None and self.get_peak(now) > self.last_value:
+            release = self.peak[1] + self.peak_hold
+            changes.append(release if release > now else now)
+        if self.rolling_max is not None:
+            changes.extend(
+                expiry
+                for expiry in (self.rolling_max.get_expiry(), self.rolling_min.get_expiry())
+                if expiry is not None
+            )
+        return min(changes) if changes else None